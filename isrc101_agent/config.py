@@ -9,20 +9,28 @@ Loading priority:
 API keys: always merged from AGENT_HOME/.agent.conf.yml (single source of truth).
 """
 
+import copy
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Optional, Dict, List, Callable, Any, TYPE_CHECKING
 
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 if TYPE_CHECKING:
     from .ui_state import UIStateManager
 
-CONFIG_DIR = Path.home() / ".isrc101-agent"
-CONFIG_FILE = CONFIG_DIR / "config.yml"
+# Overridable via the environment, e.g. to isolate test runs or parallel workers
+CONFIG_DIR = Path(os.environ.get("ISRC101_CONFIG_DIR") or Path.home() / ".isrc101-agent")
+CONFIG_FILE = Path(os.environ.get("ISRC101_CONFIG_FILE") or CONFIG_DIR / "config.yml")
 HISTORY_FILE = CONFIG_DIR / "history.txt"
 
 # Agent install directory — single source of truth for API keys
@@ -49,6 +57,36 @@ DEFAULT_GROUNDED_OFFICIAL_DOMAINS = [
     "docs.nvidia.com",
     "developer.nvidia.com",
 ]
+# Normalizer lookup tables: accepted spelling → canonical mode
+_CHAT_MODE_MAP = {"agent": "agent", "ask": "ask", "code": "agent", "architect": "agent"}
+_GROUNDED_WEB_MODE_MAP = {
+    "strict": "strict", "off": "off", "on": "strict", "true": "strict", "1": "strict",
+}
+_GROUNDED_CITATION_MAP = {mode: mode for mode in GROUNDED_CITATION_MODES}
+PROVIDER_API_KEY_ENV = {
+    "openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY",
+    "deepseek": "DEEPSEEK_API_KEY", "gemini": "GEMINI_API_KEY",
+}
+
+
+# ── YAML reading ──
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    # mtime_ns/size are only cache-key parts: an edited file misses
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def _read_yaml(path: Path) -> Any:
+    """Parse a YAML file, reusing the last in-process parse while it is unchanged.
+
+    Parses are deliberately not persisted: config files hold API keys.
+    """
+    st = os.stat(path)
+    # Callers may mutate the result; keep the cached parse pristine
+    return copy.deepcopy(_parse_yaml_cached(str(path), st.st_mtime_ns, st.st_size))
 
 
 # ── Configuration metadata and validation ──
@@ -379,22 +417,14 @@ class ModelPreset:
             return self.api_key
         if self.api_key_env:
             return os.environ.get(self.api_key_env)
-        env_map = {
-            "openai": "OPENAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY",
-            "deepseek": "DEEPSEEK_API_KEY", "gemini": "GEMINI_API_KEY",
-        }
-        env_var = env_map.get(self.provider)
+        env_var = PROVIDER_API_KEY_ENV.get(self.provider)
         return os.environ.get(env_var) if env_var else None
 
     def apply_to_env(self):
         """Set env vars as fallback. Prefer get_llm_kwargs() for direct passing."""
         key = self.resolve_api_key()
         if key:
-            provider_env = {
-                "anthropic": "ANTHROPIC_API_KEY", "deepseek": "DEEPSEEK_API_KEY",
-                "gemini": "GEMINI_API_KEY",
-            }
-            os.environ[provider_env.get(self.provider, "OPENAI_API_KEY")] = key
+            os.environ[PROVIDER_API_KEY_ENV.get(self.provider, "OPENAI_API_KEY")] = key
 
     def get_llm_kwargs(self) -> dict:
         """Return kwargs dict for LLMAdapter constructor — direct, no env vars."""
@@ -408,6 +438,64 @@ class ModelPreset:
         }
 
 
+# Built once per process; get_default_presets() hands out copies, since
+# callers (e.g. --api-key on the command line) mutate their presets.
+_DEFAULT_PRESETS: Dict[str, ModelPreset] = {
+    "local": ModelPreset(
+        name="local", provider="local", model="openai/model",
+        api_base="http://localhost:8080/v1", api_key="not-needed",
+        description="Local model (vLLM / llama.cpp on :8080)",
+        max_tokens=8192, context_window=32000,
+    ),
+    "deepseek-chat": ModelPreset(
+        name="deepseek-chat", provider="deepseek",
+        model="deepseek/deepseek-chat",
+        api_key_env="DEEPSEEK_API_KEY",
+        description="DeepSeek V3.2 (non-thinking)",
+        max_tokens=8192,
+    ),
+    "deepseek-reasoner": ModelPreset(
+        name="deepseek-reasoner", provider="deepseek",
+        model="deepseek/deepseek-reasoner",
+        api_key_env="DEEPSEEK_API_KEY",
+        description="DeepSeek V3.2 (thinking)",
+        max_tokens=8192,
+    ),
+    "qwen3-vl-235b": ModelPreset(
+        name="qwen3-vl-235b", provider="openai",
+        model="openai/Qwen3-VL-235B-A22B-Instruct",
+        api_base="https://llmapi.blsc.cn/v1/",
+        api_key_env="BLSC_API_KEY",
+        description="Qwen3-VL 235B Instruct (BLSC)",
+        max_tokens=8192,
+    ),
+    "qwen3-vl-235b-think": ModelPreset(
+        name="qwen3-vl-235b-think", provider="openai",
+        model="openai/Qwen3-VL-235B-A22B-Thinking",
+        api_base="https://llmapi.blsc.cn/v1/",
+        api_key_env="BLSC_API_KEY",
+        description="Qwen3-VL 235B Thinking (BLSC)",
+        max_tokens=8192,
+    ),
+    "qwen3-vl-30b": ModelPreset(
+        name="qwen3-vl-30b", provider="openai",
+        model="openai/Qwen3-VL-30B-A3B-Instruct",
+        api_base="https://llmapi.blsc.cn/v1/",
+        api_key_env="BLSC_API_KEY",
+        description="Qwen3-VL 30B Instruct (BLSC)",
+        max_tokens=8192,
+    ),
+    "qwen3-vl-30b-think": ModelPreset(
+        name="qwen3-vl-30b-think", provider="openai",
+        model="openai/Qwen3-VL-30B-A3B-Thinking",
+        api_base="https://llmapi.blsc.cn/v1/",
+        api_key_env="BLSC_API_KEY",
+        description="Qwen3-VL 30B Thinking (BLSC)",
+        max_tokens=8192,
+    ),
+}
+
+
 @dataclass
 class Config:
     active_model: str = "local"
@@ -511,62 +599,24 @@ class Config:
 
         return config
 
+    @classmethod
+    def from_dict(cls, data: Dict, project_dir: str = ".") -> "Config":
+        """Build a Config from already-parsed ``.agent.conf.yml`` data.
+
+        Skips file discovery, ``.env`` files, environment overrides and UI
+        state; ``save()`` writes to the project's ``.agent.conf.yml``.
+        """
+        config = cls()
+        config._apply_dict(data)
+        project_path = Path(project_dir).resolve()
+        config.project_root = str(project_path)
+        config._config_source = str(project_path / ".agent.conf.yml")
+        return config
+
     @classmethod
     def get_default_presets(cls) -> Dict[str, ModelPreset]:
-        return {
-            "local": ModelPreset(
-                name="local", provider="local", model="openai/model",
-                api_base="http://localhost:8080/v1", api_key="not-needed",
-                description="Local model (vLLM / llama.cpp on :8080)",
-                max_tokens=8192, context_window=32000,
-            ),
-            "deepseek-chat": ModelPreset(
-                name="deepseek-chat", provider="deepseek",
-                model="deepseek/deepseek-chat",
-                api_key_env="DEEPSEEK_API_KEY",
-                description="DeepSeek V3.2 (non-thinking)",
-                max_tokens=8192,
-            ),
-            "deepseek-reasoner": ModelPreset(
-                name="deepseek-reasoner", provider="deepseek",
-                model="deepseek/deepseek-reasoner",
-                api_key_env="DEEPSEEK_API_KEY",
-                description="DeepSeek V3.2 (thinking)",
-                max_tokens=8192,
-            ),
-            "qwen3-vl-235b": ModelPreset(
-                name="qwen3-vl-235b", provider="openai",
-                model="openai/Qwen3-VL-235B-A22B-Instruct",
-                api_base="https://llmapi.blsc.cn/v1/",
-                api_key_env="BLSC_API_KEY",
-                description="Qwen3-VL 235B Instruct (BLSC)",
-                max_tokens=8192,
-            ),
-            "qwen3-vl-235b-think": ModelPreset(
-                name="qwen3-vl-235b-think", provider="openai",
-                model="openai/Qwen3-VL-235B-A22B-Thinking",
-                api_base="https://llmapi.blsc.cn/v1/",
-                api_key_env="BLSC_API_KEY",
-                description="Qwen3-VL 235B Thinking (BLSC)",
-                max_tokens=8192,
-            ),
-            "qwen3-vl-30b": ModelPreset(
-                name="qwen3-vl-30b", provider="openai",
-                model="openai/Qwen3-VL-30B-A3B-Instruct",
-                api_base="https://llmapi.blsc.cn/v1/",
-                api_key_env="BLSC_API_KEY",
-                description="Qwen3-VL 30B Instruct (BLSC)",
-                max_tokens=8192,
-            ),
-            "qwen3-vl-30b-think": ModelPreset(
-                name="qwen3-vl-30b-think", provider="openai",
-                model="openai/Qwen3-VL-30B-A3B-Thinking",
-                api_base="https://llmapi.blsc.cn/v1/",
-                api_key_env="BLSC_API_KEY",
-                description="Qwen3-VL 30B Thinking (BLSC)",
-                max_tokens=8192,
-            ),
-        }
+        # Presets hold only scalars, so replace() is a full copy
+        return {name: replace(p) for name, p in _DEFAULT_PRESETS.items()}
 
     def _add_default_presets(self):
         self.models = self.get_default_presets()
@@ -574,12 +624,13 @@ class Config:
 
     def _load_yaml(self, filepath: Path):
         try:
-            with open(filepath) as f:
-                data = yaml.safe_load(f) or {}
+            data = _read_yaml(filepath)
         except Exception:
             self._add_default_presets()
             return
+        self._apply_dict(data)
 
+    def _apply_dict(self, data: Dict):
         self.active_model = data.get("active-model", "local")
         self.auto_confirm = data.get("auto-confirm", False)
         self.chat_mode = self._normalize_chat_mode(data.get("chat-mode", "agent"))
@@ -659,10 +710,10 @@ class Config:
         else:
             self.enabled_skills = list(DEFAULT_ENABLED_SKILLS)
         if "blocked-commands" in data:
-            self.blocked_commands = data["blocked-commands"]
+            self.blocked_commands = list(data["blocked-commands"])
 
         # Crew multi-agent configuration
-        self.crew_config = data.get("crew", {})
+        self.crew_config = copy.deepcopy(data.get("crew", {}))  # has nested roles
 
         self.models = {}
         for name, m in data.get("models", {}).items():
@@ -684,8 +735,7 @@ class Config:
         if not AGENT_HOME_CONFIG.exists():
             return
         try:
-            with open(AGENT_HOME_CONFIG) as f:
-                data = yaml.safe_load(f) or {}
+            data = _read_yaml(AGENT_HOME_CONFIG)
         except Exception:
             return
         home_models = data.get("models", {})
@@ -714,12 +764,8 @@ class Config:
                 except (ValueError, TypeError):
                     pass
 
-    def save(self, filepath: Optional[str] = None):
-        target = Path(filepath) if filepath else (
-            Path(self._config_source) if self._config_source else CONFIG_FILE
-        )
-        target.parent.mkdir(parents=True, exist_ok=True)
-
+    def to_dict(self) -> dict:
+        """The ``.agent.conf.yml`` data that ``save()`` writes."""
         data = {
             "active-model": self.active_model,
             "auto-confirm": self.auto_confirm,
@@ -767,7 +813,14 @@ class Config:
             if m.api_key_env:
                 entry["api-key-env"] = m.api_key_env
             data["models"][name] = entry
+        return data
 
+    def save(self, filepath: Optional[str] = None):
+        target = Path(filepath) if filepath else (
+            Path(self._config_source) if self._config_source else CONFIG_FILE
+        )
+        target.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_dict()
         with open(target, "w") as f:
             yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
         self._config_source = str(target)
@@ -851,28 +904,15 @@ class Config:
 
     @staticmethod
     def _normalize_chat_mode(value) -> str:
-        mode = str(value or "agent").strip().lower()
-        if mode in ("code", "architect"):
-            return "agent"
-        if mode not in ("agent", "ask"):
-            return "agent"
-        return mode
+        return _CHAT_MODE_MAP.get(str(value or "agent").strip().lower(), "agent")
 
     @staticmethod
     def _normalize_grounded_web_mode(value) -> str:
-        mode = str(value or "strict").strip().lower()
-        if mode in ("on", "true", "1"):
-            mode = "strict"
-        if mode not in GROUNDED_WEB_MODES:
-            return "strict"
-        return mode
+        return _GROUNDED_WEB_MODE_MAP.get(str(value or "strict").strip().lower(), "strict")
 
     @staticmethod
     def _normalize_grounded_citations(value) -> str:
-        mode = str(value or "sources_only").strip().lower()
-        if mode not in GROUNDED_CITATION_MODES:
-            return "sources_only"
-        return mode
+        return _GROUNDED_CITATION_MAP.get(str(value or "sources_only").strip().lower(), "sources_only")
 
     @staticmethod
     def _normalize_result_truncation_mode(value) -> str:
@@ -11,6 +11,23 @@ from ..theme import ACCENT as THEME_ACCENT, DIM as THEME_DIM, ERROR as THEME_ERR
 from .coordinator import Coordinator
 
 
+# ``crew:`` YAML keys (kebab-case) → CrewConfig fields
+_CREW_KEY_MAP = {
+    "max-parallel": "max_parallel",
+    "per-agent-budget": "per_agent_budget",
+    "token-budget": "token_budget",
+    "auto-review": "auto_review",
+    "max-rework": "max_rework",
+    "message-timeout": "message_timeout",
+    "task-timeout": "task_timeout",
+}
+_DISPLAY_KEY_MAP = {
+    "mode": "display_mode",
+    "max-events": "display_max_events",
+    "refresh-rate": "display_refresh_rate",
+}
+
+
 @dataclass
 class CrewConfig:
     """Configuration for crew multi-agent execution.
@@ -42,31 +59,18 @@ class CrewConfig:
         if not data:
             return cls()
 
+        # Unset keys keep the dataclass defaults
+        kwargs = {attr: data[key] for key, attr in _CREW_KEY_MAP.items() if key in data}
         display = data.get("display", {})
-        role_mults = data.get("role-budget-multipliers", {})
-        thresholds = data.get("budget-warning-thresholds", [50, 75, 90])
-
-        return cls(
-            max_parallel=data.get("max-parallel", 2),
-            per_agent_budget=data.get("per-agent-budget", 1_000_000),
-            token_budget=data.get("token-budget", 0),
-            auto_review=data.get("auto-review", True),
-            max_rework=data.get("max-rework", 2),
-            message_timeout=data.get("message-timeout", 60.0),
-            task_timeout=data.get("task-timeout", 300.0),
-            budget_warning_thresholds=list(thresholds),
-            role_budget_multipliers={
-                "coder": role_mults.get("coder", 1.0),
-                "reviewer": role_mults.get("reviewer", 0.4),
-                "researcher": role_mults.get("researcher", 0.5),
-                "tester": role_mults.get("tester", 0.6),
-                **{k: v for k, v in role_mults.items()
-                   if k not in ("coder", "reviewer", "researcher", "tester")},
-            },
-            display_mode=display.get("mode", "compact"),
-            display_max_events=display.get("max-events", 4),
-            display_refresh_rate=display.get("refresh-rate", 2),
+        kwargs.update(
+            (attr, display[key]) for key, attr in _DISPLAY_KEY_MAP.items() if key in display
         )
+        cfg = cls(**kwargs)
+        if "budget-warning-thresholds" in data:
+            cfg.budget_warning_thresholds = list(data["budget-warning-thresholds"])
+        # Configured roles override the defaults; extra roles are added
+        cfg.role_budget_multipliers.update(data.get("role-budget-multipliers", {}))
+        return cfg
 
 
 class Crew:
@@ -2,7 +2,9 @@
 
 import threading
 import time
-from typing import Dict, List, Optional
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console, Group
 from rich.panel import Panel
@@ -50,24 +52,67 @@ _STATE_DISPLAY = {
     "rework":    ("⟲", THEME_WARN,    "rework"),
     "skipped":   ("–", THEME_DIM,     "skipped"),
 }
+_UNKNOWN_STATE_DISPLAY = ("?", THEME_DIM, "?")
+
+
+@lru_cache(maxsize=8)
+def _layer_indices(
+    structure: Tuple[Tuple[str, Tuple[str, ...]], ...],
+) -> Tuple[Tuple[int, ...], ...]:
+    """Kahn's algorithm over (id, depends_on) pairs; layers keep input order."""
+    n = len(structure)
+    index = {tid: i for i, (tid, _) in enumerate(structure)}
+    indeg = array("i", [0]) * n  # unplaced dependencies per task
+    succ: List[List[int]] = [[] for _ in range(n)]
+    for i, (_, deps) in enumerate(structure):
+        indeg[i] = len(deps)  # unknown ids are never satisfied
+        for dep in deps:
+            j = index.get(dep)
+            if j is not None:
+                succ[j].append(i)
+
+    placed = bytearray(n)
+    layers: List[Tuple[int, ...]] = []
+    frontier = [i for i in range(n) if indeg[i] == 0]
+    remaining = n
+    while remaining:
+        if not frontier:
+            frontier = [i for i in range(n) if not placed[i]]  # cycle fallback
+        nxt: List[int] = []
+        for i in frontier:
+            placed[i] = 1
+            for k in succ[i]:
+                indeg[k] -= 1
+                if indeg[k] == 0:
+                    nxt.append(k)
+        layers.append(tuple(frontier))
+        remaining -= len(frontier)
+        frontier = sorted(k for k in nxt if not placed[k])
+    return tuple(layers)
 
 
 def _topo_layers(tasks: List[CrewTask]) -> List[List[CrewTask]]:
-    """Group tasks into topological layers for DAG visualization."""
-    task_map = {t.id: t for t in tasks}
-    placed: set = set()
-    layers: List[List[CrewTask]] = []
-    remaining = list(tasks)
+    """Group tasks into topological layers for DAG visualization.
+
+    The ticker calls this every refresh while only task states change, so
+    the layering is memoized on the DAG structure.
+    """
+    structure = tuple((t.id, tuple(t.depends_on)) for t in tasks)
+    return [[tasks[i] for i in layer] for layer in _layer_indices(structure)]
 
-    while remaining:
-        layer = [t for t in remaining if all(d in placed for d in t.depends_on)]
-        if not layer:
-            layer = remaining[:]  # cycle fallback
-        for t in layer:
-            placed.add(t.id)
-        remaining = [t for t in remaining if t.id not in placed]
-        layers.append(layer)
-    return layers
+
+def _upper_median(cols: List[int]) -> int:
+    """Return ``sorted(cols)[len(cols) // 2]`` without sorting small lists."""
+    n = len(cols)
+    if n == 1:
+        return cols[0]
+    if n == 2:
+        return max(cols)
+    if n == 3:
+        a, b, c = cols
+        return max(min(a, b), min(max(a, b), c))
+    cols.sort()
+    return cols[n // 2]
 
 
 def _fmt_tokens(n: int) -> str:
@@ -98,6 +143,15 @@ _BOX_CHARS = {
     frozenset({'up', 'down', 'left', 'right'}): '┼',
 }
 
+# The same lookup as a flat table indexed by a direction bitmask
+_UP, _DOWN, _LEFT, _RIGHT = 1, 2, 4, 8
+_DIR_BITS = {'up': _UP, 'down': _DOWN, 'left': _LEFT, 'right': _RIGHT}
+_BOX_TABLE = [' '] * 16
+for _dirs, _ch in _BOX_CHARS.items():
+    _BOX_TABLE[sum(_DIR_BITS[d] for d in _dirs)] = _ch
+_BOX_TABLE = tuple(_BOX_TABLE)
+del _dirs, _ch
+
 # DAG layout constants
 _DAG_COL_W = 14   # horizontal spacing between column centers
 _DAG_MARGIN = 6   # left margin
@@ -175,12 +229,10 @@ class CrewRenderer:
             )
             used: set = set()
             for task in sorted_layer:
-                parent_cols = sorted(
-                    task_col[d] for d in task.depends_on if d in task_col
-                )
+                parent_cols = [task_col[d] for d in task.depends_on if d in task_col]
                 if parent_cols:
                     # Single parent → same column; fan-in → median parent column
-                    preferred = parent_cols[len(parent_cols) // 2]
+                    preferred = _upper_median(parent_cols)
                 else:
                     preferred = 0
                 col = preferred
@@ -231,8 +283,7 @@ class CrewRenderer:
             for task in sorted_tasks:
                 center = cx(task_col[task.id])
                 state_str = states.get(task.id, "pending")
-                icon_char, color, _ = _STATE_DISPLAY.get(
-                    state_str, ("?", THEME_DIM, "?"))
+                icon_char, color, _ = _STATE_DISPLAY.get(state_str, _UNKNOWN_STATE_DISPLAY)
                 icon = get_icon(icon_char)
                 role_color = _color_for_role(task.assigned_role)
 
@@ -275,32 +326,25 @@ class CrewRenderer:
             text.append("\n")
             return
 
-        # Build direction sets at each x-position
-        dirs: Dict[int, set] = {}
+        # One direction bitmask per column of the connector row
+        masks = array("B", bytes(total_w))
+
+        def mark(x: int, bits: int) -> None:
+            if 0 <= x < total_w:
+                masks[x] |= bits
+
         for sx, tx in edges:
             if sx == tx:
-                dirs.setdefault(sx, set()).update({'up', 'down'})
-            elif sx < tx:
-                dirs.setdefault(sx, set()).add('up')
-                dirs.setdefault(sx, set()).add('right')
-                dirs.setdefault(tx, set()).add('down')
-                dirs.setdefault(tx, set()).add('left')
-                for x in range(sx + 1, tx):
-                    dirs.setdefault(x, set()).update({'left', 'right'})
+                mark(sx, _UP | _DOWN)
             else:
-                dirs.setdefault(sx, set()).add('up')
-                dirs.setdefault(sx, set()).add('left')
-                dirs.setdefault(tx, set()).add('down')
-                dirs.setdefault(tx, set()).add('right')
-                for x in range(tx + 1, sx):
-                    dirs.setdefault(x, set()).update({'left', 'right'})
-
-        # Render connector row
-        grid = [' '] * total_w
-        for x, d in dirs.items():
-            if 0 <= x < total_w:
-                grid[x] = _BOX_CHARS.get(frozenset(d), '?')
-
+                lo, hi = (sx, tx) if sx < tx else (tx, sx)
+                # Source turns toward the target; target is entered from the side
+                mark(sx, _UP | (_RIGHT if sx < tx else _LEFT))
+                mark(tx, _DOWN | (_LEFT if sx < tx else _RIGHT))
+                for x in range(max(lo + 1, 0), min(hi, total_w)):
+                    masks[x] |= _LEFT | _RIGHT
+
+        grid = map(_BOX_TABLE.__getitem__, masks)
         text.append(''.join(grid).rstrip(), style=THEME_DIM)
         text.append("\n")
 
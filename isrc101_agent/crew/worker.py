@@ -14,6 +14,14 @@ _log = logging.getLogger(__name__)
 _STATUS_UPDATE_INTERVAL = 15.0
 
 
+def _close_undo(agent):
+    """Persist a finished task's undo records before its agent is dropped."""
+    try:
+        agent.tools.files.undo.close()
+    except OSError as e:
+        _log.warning("Undo history flush failed: %s", e)
+
+
 class AgentWorker(threading.Thread):
     """Long-lived daemon thread — blocks on its inbox and executes tasks/reviews."""
 
@@ -123,6 +131,8 @@ class AgentWorker(threading.Thread):
                 content=str(e),
                 metadata={"tokens": agent.total_tokens, "elapsed": elapsed},
             ))
+        finally:
+            _close_undo(agent)
 
     def _handle_review(self, msg: CrewMessage):
         t0 = time.perf_counter()
@@ -174,6 +184,8 @@ class AgentWorker(threading.Thread):
                 metadata={"tokens": agent.total_tokens, "elapsed": time.perf_counter() - t0,
                           "review_error": True},
             ))
+        finally:
+            _close_undo(agent)
 
     def request_shutdown(self):
         self._shutdown.set()
@@ -188,11 +188,25 @@ def apply_unified_diff(content: str, diff_text: str) -> str:
     if not hunks:
         raise DiffApplyError("No hunks found in diff text.")
 
-    # Apply hunks in reverse order (bottom-to-top) to avoid line-shift issues
-    for hunk in reversed(hunks):
-        lines = _apply_hunk(lines, hunk)
+    # Splice hunks in one top-to-bottom pass: untouched runs are copied once
+    # instead of shifting the tail of the file for every hunk
+    out: List[str] = []
+    pos = 0
+    for hunk in sorted(hunks, key=lambda h: h['old_start']):
+        expected_old, new_lines = _hunk_sides(hunk)
+        # 0-indexed start; a hunk with no old lines inserts *after* line old_start
+        old_start = hunk['old_start'] if not expected_old else hunk['old_start'] - 1
+        if old_start < pos:
+            raise DiffApplyError(
+                f"Hunk at line {hunk['old_start']} overlaps the previous hunk."
+            )
+        _verify_hunk(lines, old_start, expected_old, hunk)
+        out.extend(lines[pos:old_start])
+        out.extend(new_lines)
+        pos = old_start + len(expected_old)
+    out.extend(lines[pos:])
 
-    result = "".join(lines)
+    result = "".join(out)
     # Preserve original trailing-newline behavior
     if not trailing_newline and result.endswith('\n'):
         result = result[:-1]
@@ -258,11 +272,8 @@ def _parse_hunks(diff_text: str) -> List[dict]:
     return hunks
 
 
-def _apply_hunk(lines: List[str], hunk: dict) -> List[str]:
-    """Apply a single hunk to lines, returning the modified lines list."""
-    old_start = hunk['old_start'] - 1  # convert to 0-indexed
-
-    # Build expected old lines and new replacement lines from the hunk
+def _hunk_sides(hunk: dict) -> Tuple[List[str], List[str]]:
+    """Return the (expected old lines, replacement lines) of a hunk."""
     expected_old = []
     new_lines = []
     for tag, text in hunk['lines']:
@@ -274,8 +285,11 @@ def _apply_hunk(lines: List[str], hunk: dict) -> List[str]:
             expected_old.append(text_with_nl)
         elif tag == '+':
             new_lines.append(text_with_nl)
+    return expected_old, new_lines
 
-    # Verify context: expected old lines must match the file content
+
+def _verify_hunk(lines: List[str], old_start: int, expected_old: List[str], hunk: dict):
+    """Check that the hunk's old lines match the file content at old_start."""
     for i, exp in enumerate(expected_old):
         file_idx = old_start + i
         if file_idx >= len(lines):
@@ -290,7 +304,3 @@ def _apply_hunk(lines: List[str], hunk: dict) -> List[str]:
                 f"  Expected: {exp.rstrip()!r}\n"
                 f"  Actual:   {actual.rstrip()!r}"
             )
-
-    # Replace the old range with new lines
-    lines[old_start:old_start + len(expected_old)] = new_lines
-    return lines
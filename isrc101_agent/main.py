@@ -339,11 +339,15 @@ def _run_legacy_repl(agent, config, llm, tools, console, profiler, missing_skill
             pass
 
     # ── Auto-save session on exit ──
-    # Flush any pending undo history to disk
+    # Flush any pending undo history and UI state to disk (atexit does not
+    # run when the terminal is closed)
     try:
         tools.files.undo.flush()
     except Exception:
         pass
+    ui_state = getattr(config, "ui_state", None)
+    if ui_state:
+        ui_state.flush()
 
     if agent.conversation:
         # Generate auto-save session name
@@ -4,11 +4,22 @@ import base64
 import os
 import re
 import subprocess
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple, Dict, List
 
 from ..diff_utils import generate_unified_diff, preview_str_replace, count_changes, apply_unified_diff, DiffApplyError
-from ..undo import UndoManager
+from ..undo import get_undo_manager
+
+
+_CONTENT_CACHE_SIZE = 256  # files kept in FileOps' read cache
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str, flags: int) -> "re.Pattern[str]":
+    """Compile a regex_replace pattern once, independent of re's shared cache."""
+    return re.compile(pattern, flags)
 
 
 def _ensure_newlines(text: str) -> list:
@@ -32,10 +43,10 @@ class FileOps:
 
     def __init__(self, project_root: str):
         self.project_root = Path(project_root).resolve()
-        self.undo = UndoManager(project_root)
+        self.undo = get_undo_manager(project_root)
         self._rg_available: Optional[bool] = None
-        # mtime-keyed cache: path -> (mtime, content) for preview→execute flow
-        self._content_cache: Dict[str, Tuple[float, str]] = {}
+        # LRU read cache: path -> (mtime_ns, size, content) for preview→execute flow
+        self._content_cache: OrderedDict[str, Tuple[int, int, str]] = OrderedDict()
 
     def _resolve(self, path: str) -> Path:
         p = Path(path)
@@ -51,17 +62,22 @@ class FileOps:
         return p
 
     def _read_cached(self, fp: Path) -> str:
-        """Read file content, using mtime-keyed cache to avoid redundant reads."""
+        """Read file content, using an (mtime, size)-checked cache to avoid redundant reads."""
         key = str(fp)
         try:
-            mtime = fp.stat().st_mtime
+            st = os.stat(key)
         except OSError:
             raise FileOperationError(f"Cannot stat: {fp}")
-        cached = self._content_cache.get(key)
-        if cached and cached[0] == mtime:
-            return cached[1]
+        cache = self._content_cache
+        cached = cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            cache.move_to_end(key)
+            return cached[2]
         content = fp.read_text(encoding="utf-8")
-        self._content_cache[key] = (mtime, content)
+        cache[key] = (st.st_mtime_ns, st.st_size, content)
+        cache.move_to_end(key)
+        if len(cache) > _CONTENT_CACHE_SIZE:
+            cache.popitem(last=False)
         return content
 
     def _invalidate_cache(self, fp: Path):
@@ -212,6 +228,7 @@ class FileOps:
 
         # Phase 1: validate ALL edits against original content
         errors = []
+        spans = []  # (start, end, new_str, edit number) in the original content
         for i, edit in enumerate(edits):
             old_str = edit.get("old_str")
             if old_str is None:
@@ -220,11 +237,19 @@ class FileOps:
             if "new_str" not in edit:
                 errors.append(f"Edit {i + 1}: missing 'new_str'")
                 continue
-            count = content.count(old_str)
-            if count == 0:
+            start = content.find(old_str)
+            if start < 0:
                 errors.append(f"Edit {i + 1}: old_str not found in {path}")
-            elif count > 1:
+            elif content.find(old_str, start + max(len(old_str), 1)) >= 0:
+                count = content.count(old_str)
                 errors.append(f"Edit {i + 1}: old_str appears {count}x in {path} (must be unique)")
+            else:
+                spans.append((start, start + len(old_str), edit["new_str"], i + 1))
+
+        spans.sort()
+        for (_, prev_end, _, prev_no), (start, _, _, no) in zip(spans, spans[1:]):
+            if start < prev_end:
+                errors.append(f"Edit {no}: old_str overlaps edit {prev_no}")
 
         if errors:
             raise FileOperationError(
@@ -232,10 +257,16 @@ class FileOps:
                 + "\n".join(f"  - {e}" for e in errors)
             )
 
-        # Phase 2: apply edits sequentially (content updated after each)
+        # Phase 2: splice every replacement into the original in one pass
         self.undo.backup_file(path, "multi_edit", {"path": path, "count": len(edits)}, content=content)
-        for edit in edits:
-            content = content.replace(edit["old_str"], edit["new_str"], 1)
+        parts = []
+        pos = 0
+        for start, end, new_str, _ in spans:
+            parts.append(content[pos:start])
+            parts.append(new_str)
+            pos = end
+        parts.append(content[pos:])
+        content = "".join(parts)
 
         fp.write_text(content, encoding="utf-8")
         self._invalidate_cache(fp)
@@ -364,21 +395,23 @@ class FileOps:
                 raise FileOperationError(f"Unknown regex flag: '{ch}' (use i/m/s)")
 
         try:
-            compiled = re.compile(pattern, re_flags)
+            compiled = _compile_pattern(pattern, re_flags)
         except re.error as e:
             raise FileOperationError(f"Invalid regex pattern: {e}")
 
         content = self._read_cached(fp)
 
-        # Count matches first
-        matches = compiled.findall(content)
-        if not matches:
+        try:
+            new_content, n_subs = compiled.subn(replacement, content, count=count)
+        except re.error as e:
+            raise FileOperationError(f"Invalid replacement: {e}")
+        if not n_subs:
             raise FileOperationError(f"Pattern '{pattern}' not found in {path}")
 
-        match_count = len(matches)
+        # An unlimited subn already visited every match; only a capped run needs a recount
+        match_count = n_subs if not count else sum(1 for _ in compiled.finditer(content))
         self.undo.backup_file(path, "regex_replace", {"path": path, "pattern": pattern}, content=content)
 
-        new_content, n_subs = compiled.subn(replacement, content, count=count)
         fp.write_text(new_content, encoding="utf-8")
         self._invalidate_cache(fp)
         return f"Edited {path}: {n_subs} replacement(s) made (of {match_count} match(es))"
@@ -408,11 +408,14 @@ class ISRCApp(App):
 
     def _do_quit(self) -> None:
         """Perform cleanup and exit."""
-        # Flush undo history
+        # Flush undo history and UI state
         try:
             self.tools.files.undo.flush()
         except Exception:
             pass
+        ui_state = getattr(self.config, "ui_state", None)
+        if ui_state:
+            ui_state.flush()
 
         # Auto-save session
         if self.agent.conversation:
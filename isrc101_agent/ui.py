@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Sequence, Tuple
 
 from prompt_toolkit.completion import Completion, Completer
@@ -240,6 +241,11 @@ def make_prompt_html(mode: str = "agent") -> HTML:
     return HTML(f'<style fg="{THEME_PROMPT}">></style> ')
 
 
+_STARTUP_MODE_COLORS = {"agent": "#57DB9C", "ask": "#E3B341"}
+_STARTUP_KEY_STATUS = ("[#F85149]missing[/#F85149]", "[#57DB9C]ready[/#57DB9C]")
+_STARTUP_WEB_STATUS = ("[#6E7681]off[/#6E7681]", "[#57DB9C]ON[/#57DB9C]")
+
+
 def render_startup(console, config) -> None:
     from rich.panel import Panel
     from rich.style import Style as RichStyle
@@ -289,12 +295,11 @@ def render_startup(console, config) -> None:
     console.print()
 
     # ── Status info table ──
-    key_status = "[#57DB9C]ready[/#57DB9C]" if key else "[#F85149]missing[/#F85149]"
-    web_text = "[#57DB9C]ON[/#57DB9C]" if config.web_enabled else "[#6E7681]off[/#6E7681]"
+    key_status = _STARTUP_KEY_STATUS[bool(key)]
+    web_text = _STARTUP_WEB_STATUS[bool(config.web_enabled)]
     skills_list = config.enabled_skills
     skills_text = ", ".join(skills_list) if skills_list else "[#6E7681]none[/#6E7681]"
-    mode_colors = {"agent": "#57DB9C", "ask": "#E3B341"}
-    mode_color = mode_colors.get(config.chat_mode, "#8B949E")
+    mode_color = _STARTUP_MODE_COLORS.get(config.chat_mode, "#8B949E")
 
     info = Table.grid(padding=(0, 2))
     info.add_column(style="#6E7681", min_width=9)
@@ -351,28 +356,28 @@ def _fuzzy_span_score(query: str, candidate: str) -> int | None:
     return positions[-1] - positions[0] + 1
 
 
-def _command_sort_key(token: str, spec: SlashCommandSpec, order_map: dict[str, int]):
+def _command_sort_key(token: str, spec: SlashCommandSpec, index: int):
     lowered = token.lower().lstrip("/")
     command_only = spec.command.lower().lstrip("/")
 
     if not lowered:
-        return (0, 0, order_map[spec.command])
+        return (0, 0, index)
 
     if command_only.startswith(lowered):
-        return (0, 0, order_map[spec.command])
+        return (0, 0, index)
 
     contains_pos = command_only.find(lowered)
     if contains_pos >= 0:
-        return (1, contains_pos, order_map[spec.command])
+        return (1, contains_pos, index)
 
     fuzzy_span = _fuzzy_span_score(lowered, command_only)
     if fuzzy_span is not None:
-        return (2, fuzzy_span, order_map[spec.command])
+        return (2, fuzzy_span, index)
 
     haystack = " ".join((spec.description, *spec.keywords)).lower()
     keyword_pos = haystack.find(lowered)
     if keyword_pos >= 0:
-        return (3, keyword_pos, order_map[spec.command])
+        return (3, keyword_pos, index)
 
     return None
 
@@ -389,8 +394,8 @@ class SlashCommandCompleter(Completer):
         self.specs = list(specs)
         self.max_items = max_items
         self.ui_state_manager = ui_state_manager
-        self.order_map = {spec.command: index for index, spec in enumerate(self.specs)}
         self.usage_width = max(len(spec.usage) for spec in self.specs)
+        self._cmd_lower = tuple(spec.command.lower().lstrip("/") for spec in self.specs)
 
     def _display(self, spec: SlashCommandSpec):
         """Single row: command + wide gap + description. No right padding."""
@@ -412,14 +417,28 @@ class SlashCommandCompleter(Completer):
         if not token.startswith("/"):
             return
 
+        replace_len = len(token)
+
+        # Usage priority scores, computed once per ranking pass
+        scores = self.ui_state_manager.get_all_priority_scores() if self.ui_state_manager else {}
+
+        # Fast path: prefix hits rank first, so when they alone fill the menu
+        # the contains/fuzzy tiers below could not add anything.
+        if len(token) >= 2:
+            prefix = token[1:].lower()
+            matches = [index for index, cmd in enumerate(self._cmd_lower) if cmd.startswith(prefix)]
+            if len(matches) >= self.max_items:
+                if scores:
+                    matches.sort(key=lambda index: -scores.get(self.specs[index].command, 0.0))
+                for index in matches[: self.max_items]:
+                    yield self._completion(self.specs[index], replace_len)
+                return
+
         ranked = []
-        for spec in self.specs:
-            key = _command_sort_key(token, spec, self.order_map)
+        for index, spec in enumerate(self.specs):
+            key = _command_sort_key(token, spec, index)
             if key is not None:
-                # Add usage priority score if UI state is available
-                priority_score = 0.0
-                if self.ui_state_manager:
-                    priority_score = self.ui_state_manager.get_command_priority_score(spec.command)
+                priority_score = scores.get(spec.command, 0.0)
 
                 # Combine fuzzy match key with priority score
                 # Format: (match_type, match_quality, -priority_score, original_order)
@@ -428,25 +447,29 @@ class SlashCommandCompleter(Completer):
                 ranked.append((enhanced_key, spec))
 
         ranked.sort(key=lambda item: item[0])
-        replace_len = len(token)
 
         for _, spec in ranked[: self.max_items]:
-            yield Completion(
-                text=spec.command,
-                start_position=-replace_len,
-                display=self._display(spec),
-                display_meta="",
-            )
+            yield self._completion(spec, replace_len)
+
+    def _completion(self, spec: SlashCommandSpec, replace_len: int) -> Completion:
+        return Completion(
+            text=spec.command,
+            start_position=-replace_len,
+            display=self._display(spec),
+            display_meta="",
+        )
 
 
 # ── Shared interactive pickers (Codex-style) ─────────────────
 
+@lru_cache(maxsize=1024)
 def _short(text: str, limit: int) -> str:
     if len(text) <= limit:
         return text
     return text[: max(0, limit - 1)] + "…"
 
 
+@lru_cache(maxsize=1024)
 def _safe_api_host(api_base: str | None) -> str:
     if not api_base:
         return ""
@@ -483,17 +506,19 @@ def select_model_interactive(config) -> str:
         show_host = api_host if api_host and "localhost" not in api_host else ""
         _model_cache.append((provider, desc, key_mark, show_host))
 
-    query = [""]
-    visible = [list(range(len(models)))]
-    cursor = [0]
-    result = [""]
+    query = ""
+    visible = list(range(len(models)))
+    cursor = 0
+    result = ""
+    name_width = 12
 
     def refresh_visible():
-        lowered = query[0].strip().lower()
+        nonlocal visible, cursor, name_width
+        lowered = query.strip().lower()
         if not lowered:
-            visible[0] = list(range(len(models)))
+            visible = list(range(len(models)))
         else:
-            visible[0] = [
+            visible = [
                 idx
                 for idx, model in enumerate(models)
                 if lowered in model.name.lower()
@@ -502,45 +527,46 @@ def select_model_interactive(config) -> str:
                 or lowered in (model.provider or "").lower()
             ]
 
-        if not visible[0]:
-            cursor[0] = 0
+        # Column width only changes with the filter, not per frame
+        name_width = max(12, min(18, max((len(models[idx].name) for idx in visible), default=11) + 1))
+
+        if not visible:
+            cursor = 0
             return
 
         try:
-            active_pos = visible[0].index(active_index)
+            active_pos = visible.index(active_index)
         except ValueError:
             active_pos = 0
 
-        cursor[0] = min(max(cursor[0], 0), len(visible[0]) - 1)
-        if not query[0]:
-            cursor[0] = min(active_pos, len(visible[0]) - 1)
+        cursor = min(max(cursor, 0), len(visible) - 1)
+        if not query:
+            cursor = min(active_pos, len(visible) - 1)
 
     def _current_model_index() -> int | None:
-        if not visible[0]:
+        if not visible:
             return None
-        return visible[0][cursor[0]]
+        return visible[cursor]
 
     def get_text():
         lines = []
         lines.append((f"bold {THEME_ACCENT}", " model\n"))
         lines.append(("#66788A", " ↑↓/jk move • type filter • Enter select • Esc clear/cancel\n"))
 
-        q = query[0].strip()
+        q = query.strip()
         query_text = q if q else "(all)"
         query_style = "#7AA7E8" if q else "#66788A"
         lines.append((query_style, f" filter: {query_text}\n"))
         lines.append(("", "\n"))
 
-        if not visible[0]:
+        if not visible:
             lines.append(("#D08770", " no matching models\n"))
-            lines.append(("#66788A", f"\n {len(visible[0])}/{len(models)} shown"))
+            lines.append(("#66788A", f"\n {len(visible)}/{len(models)} shown"))
             return lines
 
-        name_width = max(12, min(18, max(len(models[idx].name) for idx in visible[0]) + 1))
-
-        for pos, model_index in enumerate(visible[0]):
+        for pos, model_index in enumerate(visible):
             model = models[model_index]
-            is_current = pos == cursor[0]
+            is_current = pos == cursor
             is_active = model.name == config.active_model
 
             pointer = "›" if is_current else " "
@@ -561,7 +587,7 @@ def select_model_interactive(config) -> str:
 
         check_icon = get_icon("✓")
         active_icon = get_icon("●")
-        lines.append(("#66788A", f"\n {len(visible[0])}/{len(models)} shown • active={active_icon} • key={check_icon}"))
+        lines.append(("#66788A", f"\n {len(visible)}/{len(models)} shown • active={active_icon} • key={check_icon}"))
         return lines
 
     refresh_visible()
@@ -571,57 +597,65 @@ def select_model_interactive(config) -> str:
     @kb.add("up")
     @kb.add("k")
     def _up(_event):
-        if visible[0]:
-            cursor[0] = max(0, cursor[0] - 1)
+        nonlocal cursor
+        if visible:
+            cursor = max(0, cursor - 1)
 
     @kb.add("down")
     @kb.add("j")
     def _down(_event):
-        if visible[0]:
-            cursor[0] = min(len(visible[0]) - 1, cursor[0] + 1)
+        nonlocal cursor
+        if visible:
+            cursor = min(len(visible) - 1, cursor + 1)
 
     @kb.add("backspace")
     def _backspace(_event):
-        if query[0]:
-            query[0] = query[0][:-1]
+        nonlocal query
+        if query:
+            query = query[:-1]
             refresh_visible()
 
     @kb.add("c-u")
     def _clear_query(_event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query
+        if query:
+            query = ""
             refresh_visible()
 
     @kb.add("escape")
     def _escape(event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query, result
+        if query:
+            query = ""
             refresh_visible()
             return
-        result[0] = ""
+        result = ""
         event.app.exit()
 
     @kb.add("c-c")
     def _cancel(event):
-        result[0] = ""
+        nonlocal result
+        result = ""
         event.app.exit()
 
     @kb.add("enter")
     def _enter(event):
+        nonlocal result
         model_index = _current_model_index()
         if model_index is None:
             return
-        result[0] = models[model_index].name
+        result = models[model_index].name
         event.app.exit()
 
     @kb.add("<any>")
     def _type(event):
+        nonlocal query
         data = event.key_sequence[0].data
         if not data or len(data) != 1:
             return
         if not data.isprintable() or data in ("\r", "\n", "\t", " "):
             return
-        query[0] += data
+        query += data
         refresh_visible()
 
     control = FormattedTextControl(get_text)
@@ -633,7 +667,7 @@ def select_model_interactive(config) -> str:
     except (KeyboardInterrupt, EOFError):
         return ""
 
-    return result[0]
+    return result
 
 
 def select_skills_interactive(config, available_skills: dict) -> list[str]:
@@ -648,61 +682,61 @@ def select_skills_interactive(config, available_skills: dict) -> list[str]:
     if not names:
         return list(config.enabled_skills)
 
+    # Precompute static per-skill filter/display data (invariant across keystrokes)
+    _skill_haystacks = tuple(f"{name}\0{available_skills[name].description}".lower() for name in names)
+    _skill_desc_short = tuple(_short(available_skills[name].description.strip(), 54) for name in names)
+
     enabled = set(config.enabled_skills)
-    query = [""]
-    visible = [list(range(len(names)))]
-    cursor = [0]
-    result = [None]
+    query = ""
+    visible = list(range(len(names)))
+    cursor = 0
+    result = None
+    name_width = 16
 
     def refresh_visible():
-        lowered = query[0].strip().lower()
+        nonlocal visible, cursor, name_width
+        lowered = query.strip().lower()
         if not lowered:
-            visible[0] = list(range(len(names)))
+            visible = list(range(len(names)))
         else:
-            visible[0] = [
-                idx
-                for idx, name in enumerate(names)
-                if lowered in name.lower()
-                or lowered in available_skills[name].description.lower()
-            ]
+            visible = [idx for idx, haystack in enumerate(_skill_haystacks) if lowered in haystack]
+
+        name_width = max(16, min(24, max((len(names[idx]) for idx in visible), default=15) + 1))
 
-        if not visible[0]:
-            cursor[0] = 0
+        if not visible:
+            cursor = 0
             return
-        cursor[0] = min(max(cursor[0], 0), len(visible[0]) - 1)
+        cursor = min(max(cursor, 0), len(visible) - 1)
 
     def _current_name() -> str | None:
-        if not visible[0]:
+        if not visible:
             return None
-        return names[visible[0][cursor[0]]]
+        return names[visible[cursor]]
 
     def get_text():
         lines = []
         lines.append((f"bold {THEME_ACCENT}", " skills\n"))
         lines.append(("#66788A", " ↑↓/jk move • Space toggle • a all • c clear • Enter save • Esc clear/cancel\n"))
 
-        q = query[0].strip()
+        q = query.strip()
         query_text = q if q else "(all)"
         query_style = "#7AA7E8" if q else "#66788A"
         lines.append((query_style, f" filter: {query_text}\n"))
         lines.append(("", "\n"))
 
-        if not visible[0]:
+        if not visible:
             lines.append(("#D08770", " no matching skills\n"))
             lines.append(("#66788A", f"\n enabled {len(enabled)}/{len(names)}"))
             return lines
 
-        name_width = max(16, min(24, max(len(names[idx]) for idx in visible[0]) + 1))
-
-        for pos, name_index in enumerate(visible[0]):
+        for pos, name_index in enumerate(visible):
             name = names[name_index]
-            spec = available_skills[name]
             checked = name in enabled
-            is_current = pos == cursor[0]
+            is_current = pos == cursor
 
             pointer = "›" if is_current else " "
             marker = get_icon("✓") if checked else get_icon("·")
-            desc = _short(spec.description.strip(), 54)
+            desc = _skill_desc_short[name_index]
 
             if is_current:
                 row_style = "bold #E7EEF8"
@@ -725,14 +759,16 @@ def select_skills_interactive(config, available_skills: dict) -> list[str]:
     @kb.add("up")
     @kb.add("k")
     def _up(_event):
-        if visible[0]:
-            cursor[0] = max(0, cursor[0] - 1)
+        nonlocal cursor
+        if visible:
+            cursor = max(0, cursor - 1)
 
     @kb.add("down")
     @kb.add("j")
     def _down(_event):
-        if visible[0]:
-            cursor[0] = min(len(visible[0]) - 1, cursor[0] + 1)
+        nonlocal cursor
+        if visible:
+            cursor = min(len(visible) - 1, cursor + 1)
 
     @kb.add(" ")
     def _toggle(_event):
@@ -755,43 +791,49 @@ def select_skills_interactive(config, available_skills: dict) -> list[str]:
 
     @kb.add("backspace")
     def _backspace(_event):
-        if query[0]:
-            query[0] = query[0][:-1]
+        nonlocal query
+        if query:
+            query = query[:-1]
             refresh_visible()
 
     @kb.add("c-u")
     def _clear_query(_event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query
+        if query:
+            query = ""
             refresh_visible()
 
     @kb.add("escape")
     def _escape(event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query, result
+        if query:
+            query = ""
             refresh_visible()
             return
-        result[0] = None
+        result = None
         event.app.exit()
 
     @kb.add("c-c")
     def _cancel(event):
-        result[0] = None
+        nonlocal result
+        result = None
         event.app.exit()
 
     @kb.add("enter")
     def _save(event):
-        result[0] = sorted(enabled)
+        nonlocal result
+        result = sorted(enabled)
         event.app.exit()
 
     @kb.add("<any>")
     def _type(event):
+        nonlocal query
         data = event.key_sequence[0].data
         if not data or len(data) != 1:
             return
         if not data.isprintable() or data in ("\r", "\n", "\t", " "):
             return
-        query[0] += data
+        query += data
         refresh_visible()
 
     control = FormattedTextControl(get_text)
@@ -803,7 +845,7 @@ def select_skills_interactive(config, available_skills: dict) -> list[str]:
     except (KeyboardInterrupt, EOFError):
         return list(config.enabled_skills)
 
-    return result[0] if result[0] is not None else list(config.enabled_skills)
+    return result if result is not None else list(config.enabled_skills)
 
 
 def select_session_interactive(sessions: list[dict]) -> str:
@@ -820,49 +862,50 @@ def select_session_interactive(sessions: list[dict]) -> str:
     if not sessions:
         return ""
 
-    query = [""]
-    visible = [list(range(len(sessions)))]
-    cursor = [0]
-    result = [""]
+    query = ""
+    visible = list(range(len(sessions)))
+    cursor = 0
+    result = ""
 
     def refresh_visible():
-        lowered = query[0].strip().lower()
+        nonlocal visible, cursor
+        lowered = query.strip().lower()
         if not lowered:
-            visible[0] = list(range(len(sessions)))
+            visible = list(range(len(sessions)))
         else:
-            visible[0] = [
+            visible = [
                 idx
                 for idx, s in enumerate(sessions)
                 if lowered in s["name"].lower()
                 or lowered in " ".join(s.get("tags", [])).lower()
                 or lowered in s.get("created_at", "").lower()
             ]
-        if visible[0]:
-            cursor[0] = min(max(cursor[0], 0), len(visible[0]) - 1)
+        if visible:
+            cursor = min(max(cursor, 0), len(visible) - 1)
         else:
-            cursor[0] = 0
+            cursor = 0
 
     def get_text():
         lines = []
         lines.append((f"bold {THEME_ACCENT}", " sessions\n"))
         lines.append(("#66788A", " \u2191\u2193/jk move \u2022 type filter \u2022 Enter load \u2022 Esc cancel\n"))
 
-        q = query[0].strip()
+        q = query.strip()
         query_text = q if q else "(all)"
         query_style = "#7AA7E8" if q else "#66788A"
         lines.append((query_style, f" filter: {query_text}\n"))
         lines.append(("", "\n"))
 
-        if not visible[0]:
+        if not visible:
             lines.append(("#D08770", " no matching sessions\n"))
-            lines.append(("#66788A", f"\n {len(visible[0])}/{len(sessions)} shown"))
+            lines.append(("#66788A", f"\n {len(visible)}/{len(sessions)} shown"))
             return lines
 
-        name_w = max(14, min(24, max(len(sessions[i]["name"]) for i in visible[0]) + 1))
+        name_w = max(14, min(24, max(len(sessions[i]["name"]) for i in visible) + 1))
 
-        for pos, si in enumerate(visible[0]):
+        for pos, si in enumerate(visible):
             s = sessions[si]
-            is_current = pos == cursor[0]
+            is_current = pos == cursor
 
             pointer = "\u203a" if is_current else " "
             msgs = str(s.get("messages", 0))
@@ -879,7 +922,7 @@ def select_session_interactive(sessions: list[dict]) -> str:
             line = f" {pointer} {s['name']:<{name_w}} {msgs:>4} msgs  {tags:<16}  {tokens:>8}  {created}"
             lines.append((row_style, line + "\n"))
 
-        lines.append(("#66788A", f"\n {len(visible[0])}/{len(sessions)} shown"))
+        lines.append(("#66788A", f"\n {len(visible)}/{len(sessions)} shown"))
         return lines
 
     refresh_visible()
@@ -888,73 +931,83 @@ def select_session_interactive(sessions: list[dict]) -> str:
 
     @kb.add("up")
     def _up(event):
-        if visible[0]:
-            cursor[0] = max(0, cursor[0] - 1)
+        nonlocal cursor
+        if visible:
+            cursor = max(0, cursor - 1)
         event.app.invalidate()
 
     @kb.add("k")
     def _up_k(event):
-        if visible[0]:
-            cursor[0] = max(0, cursor[0] - 1)
+        nonlocal cursor
+        if visible:
+            cursor = max(0, cursor - 1)
         event.app.invalidate()
 
     @kb.add("down")
     def _down(event):
-        if visible[0]:
-            cursor[0] = min(len(visible[0]) - 1, cursor[0] + 1)
+        nonlocal cursor
+        if visible:
+            cursor = min(len(visible) - 1, cursor + 1)
         event.app.invalidate()
 
     @kb.add("j")
     def _down_j(event):
-        if visible[0]:
-            cursor[0] = min(len(visible[0]) - 1, cursor[0] + 1)
+        nonlocal cursor
+        if visible:
+            cursor = min(len(visible) - 1, cursor + 1)
         event.app.invalidate()
 
     @kb.add("backspace")
     def _backspace(event):
-        if query[0]:
-            query[0] = query[0][:-1]
+        nonlocal query
+        if query:
+            query = query[:-1]
             refresh_visible()
         event.app.invalidate()
 
     @kb.add("c-u")
     def _clear_query(event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query
+        if query:
+            query = ""
             refresh_visible()
         event.app.invalidate()
 
     @kb.add("escape")
     def _escape(event):
-        if query[0]:
-            query[0] = ""
+        nonlocal query, result
+        if query:
+            query = ""
             refresh_visible()
             event.app.invalidate()
             return
-        result[0] = ""
+        result = ""
         event.app.exit()
 
     @kb.add("c-c")
     def _cancel(event):
-        result[0] = ""
+        nonlocal result
+        result = ""
         event.app.exit()
 
     @kb.add("enter")
     def _enter(event):
-        if not visible[0]:
+        nonlocal result
+        if not visible:
             return
-        si = visible[0][cursor[0]]
-        result[0] = sessions[si]["name"]
+        si = visible[cursor]
+        result = sessions[si]["name"]
         event.app.exit()
 
     @kb.add("<any>")
     def _type(event):
+        nonlocal query
         data = event.key_sequence[0].data
         if not data or len(data) != 1:
             return
         if not data.isprintable() or data in ("\r", "\n", "\t", " "):
             return
-        query[0] += data
+        query += data
         refresh_visible()
         event.app.invalidate()
 
@@ -974,4 +1027,4 @@ def select_session_interactive(sessions: list[dict]) -> str:
     except (KeyboardInterrupt, EOFError):
         return ""
 
-    return result[0]
+    return result
@@ -1,18 +1,52 @@
 """UI state persistence — remember user preferences and usage patterns."""
 
+import atexit
+import heapq
 import json
+import os
 import time
+import weakref
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
 from .config import CONFIG_DIR
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 UI_STATE_FILE = CONFIG_DIR / "ui_state.json"
+_SAVE_INTERVAL = 1.0  # minimum seconds between debounced writes
+
+
+# Every live manager; flushed by one exit hook instead of one hook per instance
+_live_managers: "weakref.WeakSet[UIStateManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_at_exit():
+    for manager in list(_live_managers):
+        manager.flush()
+
+
+def _dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON encoding, using orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
 
 
 class UIStateManager:
-    """Manage UI state and command usage statistics."""
+    """Manage UI state and command usage statistics.
+
+    ``Config.load`` creates a manager per load, so several may share the
+    state file.  Each one remembers what it changed since its last save and
+    ``save()`` applies just those changes on top of a fresh read of the file
+    instead of writing out its whole, possibly stale, snapshot.
+    """
 
     def __init__(self, project_root: Optional[str] = None):
         """Initialize UI state manager.
@@ -22,6 +56,11 @@ class UIStateManager:
         """
         self.project_root = str(Path(project_root).resolve()) if project_root else None
         self.state: Dict[str, Any] = self._load_state()
+        self._dirty = False
+        self._last_save = 0.0
+        self._touched: set[tuple] = set()  # (section, key) / ("projects", root, key) set since last save
+        self._usage: Dict[str, int] = {}  # command -> uses recorded since last save
+        _live_managers.add(self)
 
     def _load_state(self) -> Dict[str, Any]:
         """Load UI state from disk."""
@@ -35,10 +74,22 @@ class UIStateManager:
                 for key in ["version", "global", "projects", "command_stats", "preferences"]:
                     if key not in data:
                         data[key] = self._default_state()[key]
+                self._migrate_command_stats(data["command_stats"])
                 return data
         except (json.JSONDecodeError, IOError):
             return self._default_state()
 
+    @staticmethod
+    def _migrate_command_stats(stats: Dict[str, Dict[str, Any]]):
+        """Derive numeric ``last_used_ts`` for entries saved before it existed."""
+        for data in stats.values():
+            if "last_used_ts" in data:
+                continue
+            try:
+                data["last_used_ts"] = datetime.fromisoformat(data["last_used"]).timestamp()
+            except (KeyError, ValueError, TypeError):
+                data["last_used_ts"] = None
+
     def _default_state(self) -> Dict[str, Any]:
         """Return default UI state structure."""
         return {
@@ -58,25 +109,67 @@ class UIStateManager:
         }
 
     def save(self):
-        """Save UI state to disk."""
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        """Merge this manager's changes into the state file and write it."""
+        self._last_save = time.monotonic()
+        self._dirty = False
+
+        state = self._load_state()
+        for path in self._touched:
+            *parents, key = path
+            src, dst = self.state, state
+            for name in parents:
+                src = src.get(name, {})
+                dst = dst.setdefault(name, {})
+            if key in src:
+                dst[key] = src[key]
+
+        # Usage counts are additive: add our uses to whatever is on disk.
+        # ISO timestamps are always local time at second precision, so the
+        # strings stay fixed width and sort lexicographically in order.
+        disk_stats = state["command_stats"]
+        ours = self.get_command_stats()
+        for command, uses in self._usage.items():
+            entry = disk_stats.setdefault(command, {"count": 0, "last_used_ts": None, "last_used": None})
+            entry["count"] = entry.get("count", 0) + uses
+            ts = ours.get(command, {}).get("last_used_ts")
+            if ts is not None and (entry.get("last_used_ts") or 0) < ts:
+                entry["last_used_ts"] = ts
+                entry["last_used"] = datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+        self._touched.clear()
+        self._usage.clear()
+        self.state = state
 
         try:
-            with open(UI_STATE_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = UI_STATE_FILE.with_suffix(".json.tmp")
+            with open(tmp, "wb") as f:
+                f.write(_dumps(self.state))
+            os.replace(tmp, UI_STATE_FILE)
         except IOError:
             pass  # Silently fail on save errors
 
+    def _maybe_save(self):
+        """Mark state dirty and save unless a save happened very recently."""
+        self._dirty = True
+        if time.monotonic() - self._last_save > _SAVE_INTERVAL:
+            self.save()
+
+    def flush(self):
+        """Write pending changes to disk (called at exit)."""
+        if self._dirty:
+            self.save()
+
     def get_global_setting(self, key: str, default: Any = None) -> Any:
         """Get a global setting."""
         return self.state.get("global", {}).get(key, default)
 
     def set_global_setting(self, key: str, value: Any):
-        """Set a global setting and save."""
+        """Set a global setting and schedule a save."""
         if "global" not in self.state:
             self.state["global"] = {}
         self.state["global"][key] = value
-        self.save()
+        self._touched.add(("global", key))
+        self._maybe_save()
 
     def get_project_setting(self, key: str, default: Any = None) -> Any:
         """Get a project-specific setting (falls back to global)."""
@@ -90,7 +183,7 @@ class UIStateManager:
         return self.get_global_setting(key, default)
 
     def set_project_setting(self, key: str, value: Any):
-        """Set a project-specific setting and save."""
+        """Set a project-specific setting and schedule a save."""
         if not self.project_root:
             self.set_global_setting(key, value)
             return
@@ -102,7 +195,8 @@ class UIStateManager:
             self.state["projects"][self.project_root] = {}
 
         self.state["projects"][self.project_root][key] = value
-        self.save()
+        self._touched.add(("projects", self.project_root, key))
+        self._maybe_save()
 
     def record_command_usage(self, command: str):
         """Record that a command was used (for statistics and autocomplete ordering).
@@ -118,13 +212,16 @@ class UIStateManager:
         if command not in stats:
             stats[command] = {
                 "count": 0,
+                "last_used_ts": None,
                 "last_used": None,
             }
 
         stats[command]["count"] += 1
-        stats[command]["last_used"] = datetime.now().isoformat()
+        # The ISO "last_used" string is filled in lazily by save()
+        stats[command]["last_used_ts"] = time.time()
+        self._usage[command] = self._usage.get(command, 0) + 1
 
-        self.save()
+        self._maybe_save()
 
     def get_command_stats(self) -> Dict[str, Dict[str, Any]]:
         """Get all command usage statistics."""
@@ -141,13 +238,9 @@ class UIStateManager:
         """
         stats = self.get_command_stats()
 
-        sorted_commands = sorted(
-            stats.items(),
-            key=lambda x: x[1]["count"],
-            reverse=True
-        )
+        top = heapq.nlargest(limit, stats.items(), key=lambda x: x[1]["count"])
 
-        return [(cmd, data["count"]) for cmd, data in sorted_commands[:limit]]
+        return [(cmd, data["count"]) for cmd, data in top]
 
     def get_recent_commands(self, limit: int = 10) -> List[str]:
         """Get most recently used commands.
@@ -160,20 +253,17 @@ class UIStateManager:
         """
         stats = self.get_command_stats()
 
-        # Filter out commands without last_used timestamp
+        # Filter out commands without last_used timestamp; sort on the
+        # numeric form so entries not yet rendered to ISO are ordered too
         with_timestamps = [
-            (cmd, data["last_used"])
+            (cmd, data["last_used_ts"])
             for cmd, data in stats.items()
-            if data.get("last_used")
+            if data.get("last_used_ts") is not None
         ]
 
-        sorted_commands = sorted(
-            with_timestamps,
-            key=lambda x: x[1],
-            reverse=True
-        )
+        recent = heapq.nlargest(limit, with_timestamps, key=lambda x: x[1])
 
-        return [cmd for cmd, _ in sorted_commands[:limit]]
+        return [cmd for cmd, _ in recent]
 
     def get_command_priority_score(self, command: str) -> float:
         """Calculate priority score for command autocomplete ordering.
@@ -189,31 +279,35 @@ class UIStateManager:
         Returns:
             Priority score (higher = more priority)
         """
-        stats = self.get_command_stats()
-
-        if command not in stats:
+        data = self.get_command_stats().get(command)
+        if data is None:
             return 0.0
+        return self._priority_score(data, time.time())
 
-        data = stats[command]
-        count = data.get("count", 0)
-        last_used = data.get("last_used")
+    def get_all_priority_scores(self) -> Dict[str, float]:
+        """Priority scores for every recorded command in one pass.
 
+        Use this when ranking many candidates at once; commands without
+        statistics are absent and should be treated as 0.0.
+        """
+        now_ts = time.time()
+        return {
+            command: self._priority_score(data, now_ts)
+            for command, data in self.get_command_stats().items()
+        }
+
+    def _priority_score(self, data: Dict[str, Any], now_ts: float) -> float:
         # Base score from usage count
-        score = float(count) * 10.0
+        score = float(data.get("count", 0)) * 10.0
 
         # Recency bonus (commands used in last 24 hours get a boost)
-        if last_used:
-            try:
-                last_time = datetime.fromisoformat(last_used)
-                now = datetime.now()
-                hours_ago = (now - last_time).total_seconds() / 3600
+        last_ts = data.get("last_used_ts")
+        if last_ts is not None:
+            hours_ago = (now_ts - last_ts) / 3600
 
-                # Recency bonus: 100 points if used in last hour, decaying over 24 hours
-                if hours_ago < 24:
-                    recency_bonus = max(0, 100 * (1 - hours_ago / 24))
-                    score += recency_bonus
-            except (ValueError, TypeError):
-                pass
+            # Recency bonus: 100 points if used in last hour, decaying over 24 hours
+            if hours_ago < 24:
+                score += max(0, 100 * (1 - hours_ago / 24))
 
         return score
 
@@ -222,11 +316,12 @@ class UIStateManager:
         return self.state.get("preferences", {}).get(key, default)
 
     def set_preference(self, key: str, value: Any):
-        """Set a user preference and save."""
+        """Set a user preference and schedule a save."""
         if "preferences" not in self.state:
             self.state["preferences"] = {}
         self.state["preferences"][key] = value
-        self.save()
+        self._touched.add(("preferences", key))
+        self._maybe_save()
 
     def get_stats_summary(self) -> Dict[str, Any]:
         """Get summary of UI state statistics for display.
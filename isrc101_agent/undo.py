@@ -1,151 +1,394 @@
 """Undo/Rollback mechanism for file operations."""
 
+import atexit
+import hashlib
 import json
+import operator
+import os
 import shutil
-from dataclasses import dataclass, asdict
+import threading
+import weakref
+import zlib
+from dataclasses import dataclass, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Store backups in project .isrc101-undo directory
 UNDO_DIR_NAME = ".isrc101-undo"
 MAX_UNDO_HISTORY = 50
+_LEGACY_HISTORY_NAME = "history.json"  # pre-log format: one JSON array, inline contents
 _FLUSH_INTERVAL = 5  # flush to disk every N operations
+_CHECKPOINT_LINES = MAX_UNDO_HISTORY * 2  # compact the log beyond this many lines
+_COMPRESS_MIN_BYTES = 10 * 1024  # larger blobs are stored zlib-compressed
+_COMPRESSED_SUFFIX = ".z"
+_LOG_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+_TMP_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+_datasync = getattr(os, "fdatasync", os.fsync)  # fdatasync is unavailable on macOS
+
+
+# Every live manager; flushed by one exit hook instead of one hook per instance
+_live_managers: "weakref.WeakSet[UndoManager]" = weakref.WeakSet()
+
+
+# One manager per project root, shared by every FileOps on it (crew workers
+# included) so a single in-memory history owns the log and its blobs
+_shared_managers: "weakref.WeakValueDictionary[Path, UndoManager]" = weakref.WeakValueDictionary()
+_shared_managers_lock = threading.Lock()
+
+
+def get_undo_manager(project_root: str) -> "UndoManager":
+    """Return the UndoManager shared by everything working on *project_root*."""
+    root = Path(project_root).resolve()
+    with _shared_managers_lock:
+        manager = _shared_managers.get(root)
+        if manager is None:
+            manager = UndoManager(str(root))
+            _shared_managers[root] = manager
+        return manager
 
 
-@dataclass
+@atexit.register
+def _flush_all_at_exit():
+    for manager in list(_live_managers):
+        try:
+            manager.close()
+        except OSError:
+            pass
+
+
+def _write_all(fd: int, data) -> None:
+    """Write *data* to *fd*, retrying on short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+    view.release()
+
+
+@dataclass(slots=True)
 class FileBackup:
     """Record of a file state before modification."""
     path: str  # Relative path
-    content: Optional[str]  # None if file didn't exist
+    content_hash: Optional[str]  # SHA-256 of the blob; None if file didn't exist
     timestamp: str
     operation: str  # 'str_replace', 'write_file', 'create_file', 'delete_file'
     tool_args: Dict  # Original tool arguments
 
 
+_BACKUP_FIELDS = tuple(f.name for f in fields(FileBackup))
+_backup_values = operator.attrgetter(*_BACKUP_FIELDS)
+
+
+def _encode_backup(backup: FileBackup) -> bytes:
+    """One JSON-lines record, using orjson when installed."""
+    # Shallow dict; unlike asdict() this doesn't deep-copy tool_args
+    record = dict(zip(_BACKUP_FIELDS, _backup_values(backup)))
+    if HAS_ORJSON:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _decode_record(line: bytes) -> Dict:
+    return orjson.loads(line) if HAS_ORJSON else json.loads(line)
+
+
+def _replace_file(fp: str, data: bytes):
+    """Atomically replace fp's contents, keeping its permission bits."""
+    fp = os.path.realpath(fp)  # write through symlinks, as write_bytes would
+    head, name = os.path.split(fp)
+    tmp = os.path.join(head, f".{name}.undo-tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        if os.path.exists(fp):
+            shutil.copymode(fp, tmp)
+        os.replace(tmp, fp)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 class UndoManager:
-    """Manages file backups and undo operations."""
+    """Manages file backups and undo operations.
+
+    History is persisted as an append-only JSON-lines log: each backup adds
+    one line, and the log is only rewritten (checkpointed) after an undo or
+    once it holds more than ``_CHECKPOINT_LINES`` records.  File contents
+    live in content-addressed blobs under ``blobs/``, so repeated backups of
+    identical content are stored once.
+
+    Obtain managers through :func:`get_undo_manager` so that everything
+    working on one project, crew worker threads included, shares a single
+    history; public methods are serialised by an internal lock.
+    """
 
     def __init__(self, project_root: str):
         self.project_root = Path(project_root).resolve()
+        self._root_str = str(self.project_root)  # for os.path joins on hot paths
         self.undo_dir = self.project_root / UNDO_DIR_NAME
-        self.history_file = self.undo_dir / "history.json"
+        self.history_file = self.undo_dir / "history.jsonl"
+        self.blob_dir = self.undo_dir / "blobs"
+        self._blobs: set = set()  # digests referenced by the log or written since
         self._history: List[FileBackup] = []
+        self._pending = bytearray()  # encoded records not yet appended to the log
+        self._log_fd: Optional[int] = None
+        self._log_lines = 0  # records currently in the on-disk log
         self._dirty = 0  # count of unsaved operations
+        self._log_stale = False  # log still holds records that were undone
+        self._dir_ensured = False  # undo_dir created and .gitignore checked
+        self._lock = threading.RLock()
         self._load_history()
+        _live_managers.add(self)
 
     def _ensure_dir(self):
-        """Ensure undo directory exists."""
+        """Ensure undo directory exists (checked once per manager)."""
+        if self._dir_ensured:
+            return
         self.undo_dir.mkdir(parents=True, exist_ok=True)
         # Add to .gitignore if not present
         gitignore = self.project_root / ".gitignore"
-        if gitignore.exists():
-            content = gitignore.read_text()
+        try:
+            with open(gitignore, encoding="utf-8") as f:
+                content = f.read()
             if UNDO_DIR_NAME not in content:
                 with open(gitignore, "a") as f:
                     f.write(f"\n# isrc101-agent undo history\n{UNDO_DIR_NAME}/\n")
+        except OSError:
+            pass  # no .gitignore, or unreadable: nothing to add to
+        self._dir_ensured = True
 
     def _load_history(self):
-        """Load undo history from disk."""
+        """Load undo history from the on-disk log."""
+        self._history = []
+        self._log_lines = 0
         if not self.history_file.exists():
-            self._history = []
+            self._migrate_legacy_history()
             return
 
+        with open(self.history_file, "rb") as f:
+            for line in f:
+                self._log_lines += 1
+                try:
+                    self._history.append(FileBackup(**_decode_record(line)))
+                except (json.JSONDecodeError, TypeError):
+                    continue  # e.g. a torn final line after a crash
+        # Blobs of records trimmed here are collected at the next checkpoint
+        self._blobs.update(b.content_hash for b in self._history if b.content_hash)
+        del self._history[:-MAX_UNDO_HISTORY]
+
+    def _migrate_legacy_history(self):
+        """Convert a ``history.json`` from older versions into the log + blobs."""
+        legacy = self.undo_dir / _LEGACY_HISTORY_NAME
         try:
-            data = json.loads(self.history_file.read_text())
-            self._history = [
-                FileBackup(**item) for item in data
-            ]
-        except (json.JSONDecodeError, TypeError):
-            self._history = []
+            items = json.loads(legacy.read_bytes())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            items = []  # unreadable: dropped, as older versions did
+        if not isinstance(items, list):
+            items = []
+        for item in items[-MAX_UNDO_HISTORY:]:
+            try:
+                content = item.pop("content")
+                item["content_hash"] = None if content is None else self._store_blob(content)
+                self._history.append(FileBackup(**item))
+            except (AttributeError, KeyError, TypeError):
+                continue
+        self._checkpoint()
+        legacy.unlink()
 
-    def _save_history(self):
-        """Save undo history to disk."""
-        self._ensure_dir()
-        # Trim old entries
-        if len(self._history) > MAX_UNDO_HISTORY:
-            self._history = self._history[-MAX_UNDO_HISTORY:]
+    def _blob_path(self, digest: str, compressed: bool = False) -> Path:
+        name = digest[2:] + _COMPRESSED_SUFFIX if compressed else digest[2:]
+        return self.blob_dir / digest[:2] / name
+
+    def _store_blob(self, content: Union[str, bytes]) -> str:
+        """Write content to its blob (once) and return the digest."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._blobs:
+            compressed = len(data) > _COMPRESS_MIN_BYTES
+            blob = self._blob_path(digest, compressed)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(digest[2:] + ".tmp")
+                tmp.write_bytes(zlib.compress(data) if compressed else data)
+                os.replace(tmp, blob)
+            self._blobs.add(digest)
+        return digest
+
+    def _read_blob(self, digest: str) -> bytes:
+        try:
+            return self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return zlib.decompress(self._blob_path(digest, True).read_bytes())
+
+    def _gc_blobs(self):
+        """Delete blobs no longer referenced by the in-memory history."""
+        live = {b.content_hash for b in self._history}
+        for digest in self._blobs - live:
+            for compressed in (False, True):
+                try:
+                    self._blob_path(digest, compressed).unlink()
+                except FileNotFoundError:
+                    pass
+        self._blobs &= live
 
-        data = [asdict(b) for b in self._history]
-        self.history_file.write_text(json.dumps(data, indent=2))
+    def _append_pending(self):
+        """Append buffered records to the log with one write + sync per batch."""
+        if self._log_stale:
+            self._checkpoint()  # appending after an undone record would revive it
+            return
+        if self._log_fd is None:
+            self._ensure_dir()
+            self._log_fd = os.open(self.history_file, _LOG_OPEN_FLAGS, 0o644)
+        _write_all(self._log_fd, self._pending)
+        _datasync(self._log_fd)
+        self._log_lines += self._dirty
+        self._pending.clear()
         self._dirty = 0
+        if self._log_lines > _CHECKPOINT_LINES:
+            self._checkpoint()
+
+    def _close_log(self):
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+
+    def close(self):
+        """Flush pending history and release the log fd (reopened on demand)."""
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._close_log()
+
+    def _checkpoint(self):
+        """Rewrite the log so it holds exactly the in-memory history."""
+        self._close_log()
+        self._ensure_dir()
+        # Write a temp file and swap it in so a crash never leaves a torn log
+        tmp = self.history_file.with_suffix(".jsonl.tmp")
+        fd = os.open(tmp, _TMP_OPEN_FLAGS, 0o644)
+        try:
+            _write_all(fd, b"".join(map(_encode_backup, self._history)))
+            _datasync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.history_file)
+        self._log_lines = len(self._history)
+        self._pending.clear()
+        self._dirty = 0
+        self._log_stale = False
+        self._gc_blobs()
 
     def _maybe_flush(self):
         """Flush to disk if enough operations have accumulated."""
         if self._dirty >= _FLUSH_INTERVAL:
-            self._save_history()
+            self._append_pending()
 
     def flush(self):
         """Explicitly flush pending history to disk."""
-        if self._dirty > 0:
-            self._save_history()
+        with self._lock:
+            if self._dirty > 0 or self._log_stale:
+                self._append_pending()
 
     def backup_file(self, path: str, operation: str, tool_args: Dict,
-                    content: Optional[str] = ...) -> bool:
+                    content: Union[str, bytes, None] = ...) -> bool:
         """Backup a file before modification.
 
         Args:
             path: Relative file path within project.
             operation: Operation name (str_replace, write_file, etc.).
             tool_args: Original tool arguments for the operation.
-            content: Pre-read file content. Pass explicitly to avoid
-                     re-reading the file. Use ``None`` to indicate the
-                     file does not exist yet. Omit (sentinel ``...``)
-                     to let the manager read it from disk.
+            content: Pre-read file content, as text or raw bytes. Pass
+                     explicitly to avoid re-reading the file. Use ``None``
+                     to indicate the file does not exist yet. Omit
+                     (sentinel ``...``) to let the manager read its bytes
+                     from disk.
         """
         if content is ...:
             # Caller did not supply content — read from disk
-            fp = self.project_root / path
+            fp = os.path.join(self._root_str, path)
             content = None
-            if fp.exists() and fp.is_file():
-                try:
-                    content = fp.read_text(encoding="utf-8")
-                except UnicodeDecodeError:
-                    return False
-
-        backup = FileBackup(
-            path=path,
-            content=content,
-            timestamp=datetime.now().isoformat(),
-            operation=operation,
-            tool_args=tool_args,
-        )
-        self._history.append(backup)
-        self._dirty += 1
-        self._maybe_flush()
-        return True
+            if os.path.isfile(fp):
+                # Raw bytes: the blob is restored verbatim, no decode needed
+                with open(fp, "rb") as f:
+                    content = f.read()
+
+        with self._lock:
+            digest = None
+            if content is not None:
+                self._ensure_dir()
+                digest = self._store_blob(content)
+
+            last = self._history[-1] if self._history else None
+            if last is not None and last.path == path and last.content_hash == digest:
+                # Undoing the previous backup already restores this exact state
+                return True
+
+            backup = FileBackup(
+                path=path,
+                content_hash=digest,
+                timestamp=datetime.now().isoformat(),
+                operation=operation,
+                tool_args=tool_args,
+            )
+            self._history.append(backup)
+            if len(self._history) > MAX_UNDO_HISTORY:
+                del self._history[:-MAX_UNDO_HISTORY]
+            self._pending += _encode_backup(backup)
+            self._dirty += 1
+            self._maybe_flush()
+            return True
 
     def undo_last(self) -> Optional[str]:
         """Undo the last file operation. Returns status message."""
-        if not self._history:
-            return None
+        with self._lock:
+            if not self._history:
+                return None
 
-        # Flush any pending saves first so on-disk state is consistent
-        self.flush()
+            backup = self._history.pop()
+            fp = os.path.join(self._root_str, backup.path)
 
-        backup = self._history.pop()
-        fp = self.project_root / backup.path
+            if backup.content_hash is None and not os.path.exists(fp):
+                # Nothing to delete; persist the pop with the next flush
+                self._log_stale = True
+                return f"File {backup.path} already doesn't exist"
 
-        try:
-            if backup.content is None:
-                # File didn't exist before - delete it
-                if fp.exists():
-                    fp.unlink()
+            try:
+                if backup.content_hash is None:
+                    # File didn't exist before - delete it
+                    os.unlink(fp)
                     result = f"Deleted {backup.path} (was created by {backup.operation})"
                 else:
-                    result = f"File {backup.path} already doesn't exist"
-            else:
-                # Restore previous content
-                fp.parent.mkdir(parents=True, exist_ok=True)
-                fp.write_text(backup.content, encoding="utf-8")
-                result = f"Restored {backup.path} (undid {backup.operation})"
-
-            self._save_history()
-            return result
-        except Exception as e:
-            # Put backup back on failure
-            self._history.append(backup)
-            return f"Undo failed: {e}"
+                    try:
+                        data = self._read_blob(backup.content_hash)
+                    except FileNotFoundError:
+                        # Blob lost (e.g. removed by hand); retrying can never succeed
+                        self._log_stale = True
+                        return (f"Cannot restore {backup.path}: its backup content is missing "
+                                f"(dropped {backup.operation} from undo history)")
+                    # Restore previous content
+                    os.makedirs(os.path.dirname(fp), exist_ok=True)
+                    _replace_file(fp, data)
+                    result = f"Restored {backup.path} (undid {backup.operation})"
+
+                # Popping is not expressible as an append, so rewrite the log
+                self._checkpoint()
+                return result
+            except Exception as e:
+                # Put backup back on failure
+                self._history.append(backup)
+                return f"Undo failed: {e}"
 
     def get_history(self, limit: int = 10) -> List[Dict]:
         """Get recent undo history."""
@@ -161,9 +404,17 @@ class UndoManager:
 
     def clear_history(self):
         """Clear all undo history."""
-        self._history = []
-        if self.undo_dir.exists():
-            shutil.rmtree(self.undo_dir)
+        with self._lock:
+            self._history = []
+            self._blobs.clear()
+            self._close_log()
+            self._pending.clear()
+            self._log_lines = 0
+            self._dirty = 0
+            self._log_stale = False
+            self._dir_ensured = False
+            if self.undo_dir.exists():
+                shutil.rmtree(self.undo_dir)
 
     @property
     def can_undo(self) -> bool:
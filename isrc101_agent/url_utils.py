@@ -1,7 +1,8 @@
 """URL/domain utility functions and reference rendering helpers."""
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from urllib.parse import urlparse
 
 __all__ = [
@@ -19,6 +20,7 @@ SEARCH_URL_RE = re.compile(r"\[[^\]]+\]\((https?://[^)\s]+)\)")
 _WHITESPACE_RE = re.compile(r"\s+")
 
 
+@lru_cache(maxsize=4096)
 def url_host(url: str) -> str:
     try:
         host = urlparse(url).netloc.lower()
@@ -32,27 +34,20 @@ def url_host(url: str) -> str:
 def matches_official_domains(url: str, domains: List[str]) -> bool:
     if not domains:
         return False
+    return _matches_domains(url, tuple(domains))
+
+
+@lru_cache(maxsize=4096)
+def _matches_domains(url: str, domains: Tuple[str, ...]) -> bool:
     host = url_host(url)
     if not host:
         return False
-    for domain in domains:
-        if host == domain or host.endswith(f".{domain}"):
-            return True
-    return False
+    return host in domains or host.endswith(tuple(f".{domain}" for domain in domains))
 
 
 def extract_search_links(result: str) -> List[str]:
-    links = SEARCH_URL_RE.findall(result or "")
-    if not links:
-        return []
-    dedup: List[str] = []
-    seen = set()
-    for link in links:
-        if link in seen:
-            continue
-        seen.add(link)
-        dedup.append(link)
-    return dedup
+    # dict keys keep first-seen order, deduplicating in the same pass
+    return list({m.group(1): None for m in SEARCH_URL_RE.finditer(result or "")})
 
 
 def normalize_text_for_match(text: str) -> str:
@@ -4,6 +4,13 @@ from typing import List
 
 __all__ = ["summarize_web_for_context", "format_web_result_preview"]
 
+_ERROR_PREFIXES = ("Web error:", "Error:", "⚠", "Blocked:", "Timed out")
+
+
+def _nonblank_lines(text: str) -> List[str]:
+    """Stripped non-empty lines, stripping each line only once."""
+    return [stripped for line in text.splitlines() if (stripped := line.strip())]
+
 
 def summarize_web_for_context(
     result: str, web_display: str,
@@ -11,7 +18,9 @@ def summarize_web_for_context(
     truncate_fn=None,
 ) -> str:
     """Store concise web content in context to reduce token pressure."""
-    if result.startswith(("Web error:", "Error:", "⚠", "Blocked:", "Timed out")):
+    if not result:
+        return result
+    if result.startswith(_ERROR_PREFIXES):
         return truncate_fn(result) if truncate_fn else result
 
     if web_display == "full":
@@ -21,7 +30,7 @@ def summarize_web_for_context(
     if not text:
         return result
 
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    lines = _nonblank_lines(text)
     if not lines:
         return ""
 
@@ -57,7 +66,9 @@ def summarize_web_for_context(
             break
 
     summary_text = "\n".join(summary_lines)
-    omitted_chars = max(0, len("\n".join(body)) - consumed)
+    # Length of "\n".join(body) without building the joined string
+    body_chars = sum(map(len, body)) + max(0, len(body) - 1)
+    omitted_chars = max(0, body_chars - consumed)
 
     parts = [header]
     if summary_text:
@@ -72,7 +83,7 @@ def format_web_result_preview(
     web_preview_lines: int, web_preview_chars: int,
 ) -> str:
     """Compress web tool output for terminal display."""
-    if result.startswith(("Web error:", "Error:", "⚠", "Blocked:", "Timed out")):
+    if not result or result.startswith(_ERROR_PREFIXES):
         return result
 
     if web_display == "full":
@@ -82,7 +93,7 @@ def format_web_result_preview(
     if not text:
         return result
 
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    lines = _nonblank_lines(text)
     if not lines:
         return result
 
@@ -94,14 +105,23 @@ def format_web_result_preview(
         url = "(unknown)"
         body_lines = lines
 
-    body_text = " ".join(body_lines).strip()
+    # Length of " ".join(body_lines) without building the joined string
+    body_chars = sum(map(len, body_lines)) + max(0, len(body_lines) - 1)
 
     if web_display == "brief":
-        if not body_text:
+        if not body_lines:
             return f"web: {url}"
         snippet_limit = max(80, min(web_preview_chars, 180))
-        snippet = body_text[:snippet_limit].strip()
-        omitted_chars = max(0, len(body_text) - len(snippet))
+        # Join only as many lines as the snippet can show
+        head: List[str] = []
+        head_chars = -1
+        for line in body_lines:
+            head.append(line)
+            head_chars += len(line) + 1
+            if head_chars >= snippet_limit:
+                break
+        snippet = " ".join(head)[:snippet_limit].strip()
+        omitted_chars = max(0, body_chars - len(snippet))
         tail = f" ... (+{omitted_chars:,} chars)" if omitted_chars > 0 else ""
         return f"web: {url} | {snippet}{tail}"
 
@@ -119,7 +139,7 @@ def format_web_result_preview(
         preview_lines.append(clipped)
         used_chars += len(clipped)
 
-    omitted_chars = max(0, len(body_text) - used_chars)
+    omitted_chars = max(0, body_chars - used_chars)
     preview = "\n     ".join(preview_lines) if preview_lines else "(no preview)"
     tail = (
         f"\n     ... ({omitted_chars:,} chars omitted)"
@@ -10,9 +10,6 @@ import sys
 import os
 from pathlib import Path
 
-# Add the current directory to Python path to ensure imports work
-sys.path.insert(0, str(Path(__file__).parent))
-
 def main():
     """
     Main entry point for the application.
@@ -44,4 +41,8 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Add the current directory to Python path to ensure imports work.
+    # Only when run as a script, so importing this module (e.g. from
+    # run.py, which sets up the path itself) leaves sys.path alone.
+    sys.path.insert(0, str(Path(__file__).parent))
     main()
\ No newline at end of file
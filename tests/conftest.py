@@ -1,6 +1,8 @@
 """Shared fixtures for isrc101-agent tests."""
 
+import copy
 import os
+import shutil
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -8,6 +10,25 @@ from unittest.mock import MagicMock
 import pytest
 import yaml
 
+# Point user-level state (config, UI state, sessions) at a throwaway
+# directory before any isrc101_agent module reads it; each xdist worker
+# imports conftest separately and so gets its own directory.
+_TEST_CONFIG_DIR = None
+if "ISRC101_CONFIG_DIR" not in os.environ:
+    _TEST_CONFIG_DIR = tempfile.mkdtemp(prefix="isrc101-test-home-")
+    os.environ["ISRC101_CONFIG_DIR"] = _TEST_CONFIG_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if _TEST_CONFIG_DIR:
+        shutil.rmtree(_TEST_CONFIG_DIR, ignore_errors=True)
+
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper
+
 
 @pytest.fixture
 def tmp_dir(tmp_path):
@@ -18,9 +39,9 @@ def tmp_dir(tmp_path):
     os.chdir(orig)
 
 
-@pytest.fixture
-def sample_config_data():
-    """Minimal .agent.conf.yml data dict."""
+@pytest.fixture(scope="session")
+def _sample_config_template():
+    """Canonical sample config, built once; never mutate it."""
     return {
         "active-model": "local",
         "auto-confirm": False,
@@ -64,11 +85,28 @@ def sample_config_data():
 
 
 @pytest.fixture
-def config_yaml_file(tmp_dir, sample_config_data):
+def sample_config_data(_sample_config_template):
+    """Minimal .agent.conf.yml data dict (a private copy, safe to mutate)."""
+    return copy.deepcopy(_sample_config_template)
+
+
+@pytest.fixture
+def sample_config_ro(_sample_config_template):
+    """The shared sample config dict, for tests that only read it."""
+    return _sample_config_template
+
+
+@pytest.fixture(scope="session")
+def _sample_config_yaml(_sample_config_template):
+    """The sample config rendered to YAML once per session."""
+    return yaml.dump(_sample_config_template, Dumper=SafeDumper, default_flow_style=False)
+
+
+@pytest.fixture
+def config_yaml_file(tmp_dir, _sample_config_yaml):
     """Write a config YAML to tmp_dir and return its Path."""
     path = tmp_dir / ".agent.conf.yml"
-    with open(path, "w") as f:
-        yaml.dump(sample_config_data, f, default_flow_style=False)
+    path.write_text(_sample_config_yaml)
     return path
 
 
@@ -3,10 +3,17 @@
 import os
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+import isrc101_agent.config as config_module
 from isrc101_agent.config import (
     Config,
     ModelPreset,
@@ -19,14 +26,10 @@ from isrc101_agent.config import (
 
 
 class TestConfigLoad:
-    """Config.load() from YAML files."""
-
-    def test_load_from_yaml(self, tmp_dir, sample_config_data):
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
+    """Config.load() / Config.from_dict() from parsed config data."""
 
-        config = Config.load(str(tmp_dir))
+    def test_load_from_dict(self, tmp_dir, sample_config_ro):
+        config = Config.from_dict(sample_config_ro, str(tmp_dir))
         assert config.active_model == "local"
         assert config.auto_confirm is False
         assert config.chat_mode == "agent"
@@ -34,12 +37,8 @@ class TestConfigLoad:
         assert config.commit_prefix == "test: "
         assert config.reasoning_display == "summary"
 
-    def test_load_models(self, tmp_dir, sample_config_data):
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
-
-        config = Config.load(str(tmp_dir))
+    def test_load_models(self, tmp_dir, sample_config_ro):
+        config = Config.from_dict(sample_config_ro, str(tmp_dir))
         assert "local" in config.models
         preset = config.models["local"]
         assert isinstance(preset, ModelPreset)
@@ -54,95 +53,120 @@ class TestConfigLoad:
         assert len(config.models) > 0
         assert "local" in config.models
 
+    def test_default_presets_are_independent_copies(self):
+        presets = Config.get_default_presets()
+        presets["local"].api_key = "changed"
+        presets["extra"] = presets["local"]
+
+        config = Config()
+        config._add_default_presets()
+        assert "extra" not in config.models
+        assert config.models["local"].api_key == "not-needed"
+        assert Config.get_default_presets()["local"].api_key == "not-needed"
+
     def test_load_crew_section(self, tmp_dir, sample_config_data):
         sample_config_data["crew"] = {
             "max-parallel": 4,
             "per-agent-budget": 0,
             "token-budget": 0,
         }
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
-
-        config = Config.load(str(tmp_dir))
+        config = Config.from_dict(sample_config_data, str(tmp_dir))
         assert config.crew_config == {
             "max-parallel": 4,
             "per-agent-budget": 0,
             "token-budget": 0,
         }
 
+    def test_load_does_not_alias_input(self, tmp_dir, sample_config_data):
+        sample_config_data["crew"] = {"roles": {"coder": {"mode": "agent"}}}
+        sample_config_data["blocked-commands"] = ["rm -rf /"]
+        config = Config.from_dict(sample_config_data, str(tmp_dir))
+        config.crew_config["roles"]["coder"]["mode"] = "ask"
+        config.blocked_commands.append("shutdown")
+        assert sample_config_data["crew"]["roles"]["coder"]["mode"] == "agent"
+        assert sample_config_data["blocked-commands"] == ["rm -rf /"]
+
+    def test_unchanged_yaml_is_parsed_once(self, tmp_dir, config_yaml_file):
+        config_module._parse_yaml_cached.cache_clear()
+        Config.load(str(tmp_dir))
+        config_module._read_yaml(config_yaml_file)["models"].clear()
+        with patch.object(config_module.yaml, "load", side_effect=AssertionError("re-parsed")):
+            second = Config.load(str(tmp_dir))
+        assert second.commit_prefix == "test: "
+        assert "local" in second.models
+
+    def test_edited_yaml_is_reparsed(self, tmp_dir, config_yaml_file, sample_config_data):
+        config_module._parse_yaml_cached.cache_clear()
+        Config.load(str(tmp_dir))
+        sample_config_data["commit-prefix"] = "edited-prefix: "
+        config_yaml_file.write_text(yaml.safe_dump(sample_config_data))
+        assert Config.load(str(tmp_dir)).commit_prefix == "edited-prefix: "
+
 
 class TestConfigNormalization:
     """Mode and value normalization methods."""
 
-    def test_normalize_chat_mode_valid(self):
-        assert Config._normalize_chat_mode("agent") == "agent"
-        assert Config._normalize_chat_mode("ask") == "ask"
-
-    def test_normalize_chat_mode_aliases(self):
-        assert Config._normalize_chat_mode("code") == "agent"
-        assert Config._normalize_chat_mode("architect") == "agent"
-
-    def test_normalize_chat_mode_invalid(self):
-        assert Config._normalize_chat_mode("invalid") == "agent"
-        assert Config._normalize_chat_mode("") == "agent"
-        assert Config._normalize_chat_mode(None) == "agent"
-
-    def test_normalize_reasoning_display(self):
-        assert Config._normalize_reasoning_display("off") == "off"
-        assert Config._normalize_reasoning_display("summary") == "summary"
-        assert Config._normalize_reasoning_display("full") == "full"
-        assert Config._normalize_reasoning_display("invalid") == "summary"
-
-    def test_normalize_web_display(self):
-        assert Config._normalize_web_display("brief") == "brief"
-        assert Config._normalize_web_display("summary") == "summary"
-        assert Config._normalize_web_display("full") == "full"
-        assert Config._normalize_web_display("invalid") == "brief"
-
-    def test_normalize_answer_style(self):
-        assert Config._normalize_answer_style("concise") == "concise"
-        assert Config._normalize_answer_style("balanced") == "balanced"
-        assert Config._normalize_answer_style("detailed") == "detailed"
-        assert Config._normalize_answer_style("invalid") == "concise"
-
-    def test_normalize_grounded_web_mode(self):
-        assert Config._normalize_grounded_web_mode("strict") == "strict"
-        assert Config._normalize_grounded_web_mode("off") == "off"
-        assert Config._normalize_grounded_web_mode("on") == "strict"
-        assert Config._normalize_grounded_web_mode("true") == "strict"
-
-    def test_coerce_bool(self):
-        assert Config._coerce_bool(True, False) is True
-        assert Config._coerce_bool(False, True) is False
-        assert Config._coerce_bool("true", False) is True
-        assert Config._coerce_bool("false", True) is False
-        assert Config._coerce_bool("yes", False) is True
-        assert Config._coerce_bool("no", True) is False
-        assert Config._coerce_bool("1", False) is True
-        assert Config._coerce_bool("0", True) is False
-        assert Config._coerce_bool("garbage", True) is True
-        assert Config._coerce_bool(1, False) is True
-        assert Config._coerce_bool(0, True) is False
-
-    def test_coerce_positive_int(self):
-        assert Config._coerce_positive_int(5, 10, 1, 100) == 5
-        assert Config._coerce_positive_int(-1, 10, 1, 100) == 1
-        assert Config._coerce_positive_int(200, 10, 1, 100) == 100
-        assert Config._coerce_positive_int("bad", 10, 1, 100) == 10
-
-    def test_normalize_domain_list(self):
-        result = Config._normalize_domain_list(["docs.nvidia.com", "developer.nvidia.com"])
-        assert "docs.nvidia.com" in result
-        assert "developer.nvidia.com" in result
-
-    def test_normalize_domain_list_dedup(self):
-        result = Config._normalize_domain_list(["foo.com", "foo.com", "bar.com"])
-        assert result == ["foo.com", "bar.com"]
-
-    def test_normalize_domain_list_strips_protocol(self):
-        result = Config._normalize_domain_list(["https://foo.com/path", "http://bar.com"])
-        assert result == ["foo.com", "bar.com"]
+    @pytest.mark.parametrize("method,value,expected", [
+        ("_normalize_chat_mode", "agent", "agent"),
+        ("_normalize_chat_mode", "ask", "ask"),
+        ("_normalize_chat_mode", "code", "agent"),
+        ("_normalize_chat_mode", "architect", "agent"),
+        ("_normalize_chat_mode", "invalid", "agent"),
+        ("_normalize_chat_mode", "", "agent"),
+        ("_normalize_chat_mode", None, "agent"),
+        ("_normalize_reasoning_display", "off", "off"),
+        ("_normalize_reasoning_display", "summary", "summary"),
+        ("_normalize_reasoning_display", "full", "full"),
+        ("_normalize_reasoning_display", "invalid", "summary"),
+        ("_normalize_web_display", "brief", "brief"),
+        ("_normalize_web_display", "summary", "summary"),
+        ("_normalize_web_display", "full", "full"),
+        ("_normalize_web_display", "invalid", "brief"),
+        ("_normalize_answer_style", "concise", "concise"),
+        ("_normalize_answer_style", "balanced", "balanced"),
+        ("_normalize_answer_style", "detailed", "detailed"),
+        ("_normalize_answer_style", "invalid", "concise"),
+        ("_normalize_grounded_web_mode", "strict", "strict"),
+        ("_normalize_grounded_web_mode", "off", "off"),
+        ("_normalize_grounded_web_mode", "on", "strict"),
+        ("_normalize_grounded_web_mode", "true", "strict"),
+        ("_normalize_grounded_web_mode", " On ", "strict"),
+        ("_normalize_grounded_web_mode", "invalid", "strict"),
+        ("_normalize_grounded_citations", "inline", "inline"),
+        ("_normalize_grounded_citations", "sources_only", "sources_only"),
+        ("_normalize_grounded_citations", None, "sources_only"),
+        ("_normalize_grounded_citations", "invalid", "sources_only"),
+    ])
+    def test_normalize_mode(self, method, value, expected):
+        assert getattr(Config, method)(value) == expected
+
+    @pytest.mark.parametrize("value,default,expected", [
+        (True, False, True),
+        (False, True, False),
+        ("true", False, True),
+        ("false", True, False),
+        ("yes", False, True),
+        ("no", True, False),
+        ("1", False, True),
+        ("0", True, False),
+        ("garbage", True, True),
+        (1, False, True),
+        (0, True, False),
+    ])
+    def test_coerce_bool(self, value, default, expected):
+        assert Config._coerce_bool(value, default) is expected
+
+    @pytest.mark.parametrize("value,expected", [(5, 5), (-1, 1), (200, 100), ("bad", 10)])
+    def test_coerce_positive_int(self, value, expected):
+        assert Config._coerce_positive_int(value, 10, 1, 100) == expected
+
+    @pytest.mark.parametrize("value,expected", [
+        (["docs.nvidia.com", "developer.nvidia.com"], ["docs.nvidia.com", "developer.nvidia.com"]),
+        (["foo.com", "foo.com", "bar.com"], ["foo.com", "bar.com"]),
+        (["https://foo.com/path", "http://bar.com"], ["foo.com", "bar.com"]),
+    ])
+    def test_normalize_domain_list(self, value, expected):
+        assert Config._normalize_domain_list(value) == expected
 
 
 class TestModelPreset:
@@ -175,75 +199,58 @@ class TestModelPreset:
 class TestValidateConfigValue:
     """validate_config_value() for all field types."""
 
-    def test_unknown_key(self):
-        valid, val, err = validate_config_value("nonexistent-key", "whatever")
-        assert not valid
-        assert "Unknown" in err
-
-    def test_bool_field(self):
-        valid, val, err = validate_config_value("auto-confirm", "true")
-        assert valid
-        assert val is True
-
-    def test_int_field(self):
-        valid, val, err = validate_config_value("command-timeout", "60")
+    @pytest.mark.parametrize("key,value,expected", [
+        ("auto-confirm", "true", True),
+        ("command-timeout", "60", 60),
+        ("chat-mode", "ask", "ask"),
+        ("active-model", "anything", "anything"),
+    ], ids=["bool", "int", "enum", "active-model-passthrough"])
+    def test_valid(self, key, value, expected):
+        valid, val, err = validate_config_value(key, value)
         assert valid
-        assert val == 60
-
-    def test_int_field_out_of_range(self):
-        valid, val, err = validate_config_value("command-timeout", "999")
+        assert val == expected and type(val) is type(expected)
+
+    @pytest.mark.parametrize("key,value,err_part", [
+        ("nonexistent-key", "whatever", "Unknown"),
+        ("command-timeout", "999", "between"),
+        ("chat-mode", "invalid_mode", "must be one of"),
+    ], ids=["unknown-key", "int-out-of-range", "enum-invalid"])
+    def test_invalid(self, key, value, err_part):
+        valid, val, err = validate_config_value(key, value)
         assert not valid
-        assert "between" in err.lower() or val != 999
-
-    def test_enum_field(self):
-        valid, val, err = validate_config_value("chat-mode", "ask")
-        assert valid
-        assert val == "ask"
-
-    def test_enum_field_invalid(self):
-        valid, val, err = validate_config_value("chat-mode", "invalid_mode")
-        assert not valid
-
-    def test_active_model_passthrough(self):
-        valid, val, err = validate_config_value("active-model", "anything")
-        assert valid
-        assert val == "anything"
+        assert err_part.lower() in err.lower()
 
 
 class TestConfigSave:
     """Config.save() round-trip."""
 
-    def test_save_and_reload(self, tmp_dir, sample_config_data):
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
+    def test_to_dict(self, tmp_dir, sample_config_ro):
+        config = Config.from_dict(sample_config_ro, str(tmp_dir))
+        config.web_enabled = True
+        data = config.to_dict()
+        assert data["web-enabled"] is True
+        assert data["models"]["local"]["api-base"] == "http://localhost:8080/v1"
 
+    def test_yaml_round_trip(self, tmp_dir, config_yaml_file):
         config = Config.load(str(tmp_dir))
         config.active_model = "local"
         config.web_enabled = True
-        config.save(str(path))
+        config.save(str(config_yaml_file))
 
         # Reload from YAML — web_enabled persists via YAML (not overridden by UIState)
-        with open(path) as f:
-            raw = yaml.safe_load(f)
+        raw = yaml.load(config_yaml_file.read_text(), Loader=SafeLoader)
+        assert raw == config.to_dict()
         assert raw["web-enabled"] is True
 
-    def test_set_config_value(self, tmp_dir, sample_config_data):
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
-
-        config = Config.load(str(tmp_dir))
+    def test_set_config_value(self, tmp_dir, sample_config_ro):
+        config = Config.from_dict(sample_config_ro, str(tmp_dir))
         success, err = config.set_config_value("reasoning-display", "full")
         assert success
         assert config.reasoning_display == "full"
+        assert (tmp_dir / ".agent.conf.yml").exists()
 
-    def test_reset_config_value(self, tmp_dir, sample_config_data):
-        path = tmp_dir / ".agent.conf.yml"
-        with open(path, "w") as f:
-            yaml.dump(sample_config_data, f)
-
-        config = Config.load(str(tmp_dir))
+    def test_reset_config_value(self, tmp_dir, sample_config_ro):
+        config = Config.from_dict(sample_config_ro, str(tmp_dir))
         config.set_config_value("reasoning-display", "full")
         success, err = config.reset_config_value("reasoning-display")
         assert success
@@ -4,9 +4,11 @@ import io
 
 import pytest
 from rich.console import Console
-from rich.text import Text
 
-from isrc101_agent.crew.rendering import CrewRenderer, _topo_layers, _BOX_CHARS
+from isrc101_agent.crew.rendering import (
+    CrewRenderer, _topo_layers, _layer_indices, _upper_median,
+    _BOX_CHARS, _BOX_TABLE, _DIR_BITS,
+)
 from isrc101_agent.crew.tasks import CrewTask
 
 
@@ -19,13 +21,18 @@ def _make_tasks(specs):
     ]
 
 
+# One console/renderer for the module; its buffer is emptied per render
+_DAG_CONSOLE = Console(file=io.StringIO(), force_terminal=False, width=120)
+_DAG_RENDERER = CrewRenderer(_DAG_CONSOLE)
+
+
 def _render_dag_text(tasks, states=None):
     """Render DAG to plain text for assertion."""
-    buf = io.StringIO()
-    console = Console(file=buf, force_terminal=False, width=120)
-    renderer = CrewRenderer(console)
-    dag = renderer._build_dag_graph(tasks, states)
-    console.print(dag, end="")
+    buf = _DAG_CONSOLE.file
+    buf.seek(0)
+    buf.truncate()
+    dag = _DAG_RENDERER._build_dag_graph(tasks, states)
+    _DAG_CONSOLE.print(dag, end="")
     return buf.getvalue()
 
 
@@ -68,6 +75,36 @@ class TestTopoLayers:
         assert {t.id for t in layers[1]} == {"t2", "t3"}
         assert [t.id for t in layers[2]] == ["t4"]
 
+    def test_cycle_falls_back_to_one_layer(self):
+        tasks = _make_tasks([
+            ("t1", "researcher", []),
+            ("t2", "coder", ["t3"]),
+            ("t3", "coder", ["t2"]),
+            ("t4", "reviewer", ["missing"]),
+        ])
+        layers = _topo_layers(tasks)
+        assert [[t.id for t in layer] for layer in layers] == [["t1"], ["t2", "t3", "t4"]]
+
+    def test_layer_keeps_input_order(self):
+        tasks = _make_tasks([
+            ("t1", "researcher", []),
+            ("t3", "coder", ["t2"]),
+            ("t2", "coder", []),
+            ("t4", "coder", ["t1"]),
+        ])
+        layers = _topo_layers(tasks)
+        assert [[t.id for t in layer] for layer in layers] == [["t1", "t2"], ["t3", "t4"]]
+
+    def test_layering_is_memoized_on_structure(self):
+        tasks = _make_tasks([("t1", "coder", []), ("t2", "coder", ["t1"])])
+        _layer_indices.cache_clear()
+        _topo_layers(tasks)
+        _topo_layers(list(tasks))
+        assert _layer_indices.cache_info().hits == 1
+
+        tasks[1].depends_on = []
+        assert [[t.id for t in layer] for layer in _topo_layers(tasks)] == [["t1", "t2"]]
+
 
 class TestColumnAssignment:
     """_assign_dag_columns() places nodes in correct columns."""
@@ -113,6 +150,12 @@ class TestColumnAssignment:
         # t3 placed at median of parents
         assert cols["t3"] in (cols["t1"], cols["t2"])
 
+    @pytest.mark.parametrize("cols", [
+        [3], [4, 1], [1, 4], [2, 0, 1], [0, 2, 2], [5, 1, 3, 0], [2, 2, 0, 1, 4],
+    ])
+    def test_upper_median_matches_sorted(self, cols):
+        assert _upper_median(list(cols)) == sorted(cols)[len(cols) // 2]
+
     def test_fan_out(self):
         tasks = _make_tasks([
             ("t1", "researcher", []),
@@ -129,26 +172,21 @@ class TestColumnAssignment:
 class TestBoxDrawingChars:
     """_BOX_CHARS covers all 4-bit direction combos."""
 
-    def test_straight_vertical(self):
-        assert _BOX_CHARS[frozenset({'up', 'down'})] == '│'
-
-    def test_straight_horizontal(self):
-        assert _BOX_CHARS[frozenset({'left', 'right'})] == '─'
-
-    def test_corners(self):
-        assert _BOX_CHARS[frozenset({'up', 'right'})] == '└'
-        assert _BOX_CHARS[frozenset({'up', 'left'})] == '┘'
-        assert _BOX_CHARS[frozenset({'down', 'right'})] == '┌'
-        assert _BOX_CHARS[frozenset({'down', 'left'})] == '┐'
-
-    def test_tees(self):
-        assert _BOX_CHARS[frozenset({'up', 'down', 'right'})] == '├'
-        assert _BOX_CHARS[frozenset({'up', 'down', 'left'})] == '┤'
-        assert _BOX_CHARS[frozenset({'up', 'left', 'right'})] == '┴'
-        assert _BOX_CHARS[frozenset({'down', 'left', 'right'})] == '┬'
+    @pytest.mark.parametrize("dirs,ch", [
+        ({'up', 'down'}, '│'), ({'left', 'right'}, '─'),
+        ({'up', 'right'}, '└'), ({'up', 'left'}, '┘'),
+        ({'down', 'right'}, '┌'), ({'down', 'left'}, '┐'),
+        ({'up', 'down', 'right'}, '├'), ({'up', 'down', 'left'}, '┤'),
+        ({'up', 'left', 'right'}, '┴'), ({'down', 'left', 'right'}, '┬'),
+        ({'up', 'down', 'left', 'right'}, '┼'),
+    ])
+    def test_box_char(self, dirs, ch):
+        assert _BOX_CHARS[frozenset(dirs)] == ch
 
-    def test_cross(self):
-        assert _BOX_CHARS[frozenset({'up', 'down', 'left', 'right'})] == '┼'
+    def test_bitmask_table_matches_sets(self):
+        assert len(_BOX_TABLE) == 16
+        for dirs, ch in _BOX_CHARS.items():
+            assert _BOX_TABLE[sum(_DIR_BITS[d] for d in dirs)] == ch
 
 
 class TestDagGraphRendering:
@@ -238,7 +276,7 @@ class TestDagGraphRendering:
         states = {"t1": "done", "t2": "running"}
         output = _render_dag_text(tasks, states)
         # t1 should show done icon, t2 should show running icon
-        assert "✓" in output or "✓" in output  # done icon
+        assert "✓" in output  # done icon
         assert "▸" in output  # running icon
 
     def test_no_tasks_returns_placeholder(self):
@@ -6,8 +6,10 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from isrc101_agent.agent import Agent
 
-@dataclass
+
+@dataclass(slots=True)
 class FakeLLMResponse:
     content: Optional[str] = None
     reasoning_content: Optional[str] = None
@@ -37,69 +39,72 @@ class FakeLLM:
 
     def chat_stream(self, messages, tools=None):
         resp = self.chat(messages, tools)
+        events = []
         if resp.reasoning_content:
-            yield ("reasoning", resp.reasoning_content)
+            events.append(("reasoning", resp.reasoning_content))
         if resp.content:
-            yield ("text", resp.content)
-        yield ("done", resp)
+            events.append(("text", resp.content))
+        events.append(("done", resp))
+        return iter(events)
 
     def warmup_async(self):
         pass
 
 
-def _make_agent(llm):
-    """Create an Agent with minimal mocking."""
-    from isrc101_agent.agent import Agent
-
-    tools = MagicMock()
-    tools.schemas = []
-    tools.git = MagicMock()
-    tools.git.available = False
+@pytest.fixture(scope="module")
+def make_agent():
+    """Factory creating an Agent with minimal mocking."""
+    def _factory(llm):
+        tools = MagicMock()
+        tools.schemas = []
+        tools.git = MagicMock()
+        tools.git.available = False
 
-    agent = Agent(
-        llm=llm,
-        tools=tools,
-        auto_confirm=True,
-        chat_mode="ask",
-        skill_instructions="",
-    )
-    agent.quiet = True
-    return agent
+        agent = Agent(
+            llm=llm,
+            tools=tools,
+            auto_confirm=True,
+            chat_mode="ask",
+            skill_instructions="",
+        )
+        agent.quiet = True
+        return agent
+    return _factory
 
 
 class TestEmptyResponseHandling:
     """Agent.chat() handles empty and reasoning-only responses correctly."""
 
-    def test_truly_empty_response_stops_after_max(self):
+    def test_truly_empty_response_stops_after_max(self, make_agent):
         """Truly empty responses (no content, no reasoning) stop after _MAX_EMPTY."""
         responses = [FakeLLMResponse() for _ in range(10)]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         result = agent.chat("hello")
         assert "consecutive empty responses" in result.lower() or "stopping" in result.lower()
 
-    def test_reasoning_only_uses_fallback(self):
+    def test_reasoning_only_uses_fallback(self, make_agent):
         """Reasoning-only responses eventually return reasoning as fallback."""
         responses = [
             FakeLLMResponse(reasoning_content="I need to think about this carefully.")
             for _ in range(10)
         ]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         result = agent.chat("hello")
         # Should return reasoning as fallback, not the "Stopping" message
         assert "think about this carefully" in result
 
-    def test_reasoning_only_adds_nudge_messages(self):
+    def test_reasoning_only_adds_nudge_messages(self, make_agent):
         """On reasoning-only, nudge messages are added to conversation."""
         responses = [
             FakeLLMResponse(reasoning_content="Let me consider..."),
             FakeLLMResponse(content="Here is my answer."),  # Succeeds on 2nd try
         ]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         result = agent.chat("hello")
         assert result == "Here is my answer."
@@ -107,21 +112,21 @@ class TestEmptyResponseHandling:
         texts = [m.get("content", "") for m in agent.conversation]
         assert any("provide your actual response" in t for t in texts)
 
-    def test_empty_then_content_resets_streak(self):
+    def test_empty_then_content_resets_streak(self, make_agent):
         """Content response after empty resets the streak."""
         responses = [
             FakeLLMResponse(),  # empty #1
             FakeLLMResponse(content="Got it!"),  # success
         ]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         result = agent.chat("hello")
         # The empty response doesn't add nudge (no reasoning), but the retry
         # with same prompt may succeed
         assert result == "Got it!"
 
-    def test_tool_call_resets_empty_streak(self):
+    def test_tool_call_resets_empty_streak(self, make_agent):
         """Tool calls between empty responses reset the streak counter."""
         from isrc101_agent.llm import ToolCall
 
@@ -131,7 +136,7 @@ class TestEmptyResponseHandling:
             FakeLLMResponse(content="Done reading."),
         ]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
         # Mock tool execution
         agent.tools.execute = MagicMock(return_value="file content")
         agent.tools.can_parallelize = MagicMock(return_value=False)
@@ -139,24 +144,24 @@ class TestEmptyResponseHandling:
         result = agent.chat("read test.txt")
         assert "Done reading" in result
 
-    def test_max_empty_increased_to_five(self):
+    def test_max_empty_increased_to_five(self, make_agent):
         """_MAX_EMPTY should be 5, giving more retry chances with nudges."""
         responses = [FakeLLMResponse() for _ in range(10)]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         agent.chat("hello")
         # Should have made 5 calls (not 3)
         assert llm._call_count == 5
 
-    def test_reasoning_fallback_added_to_conversation(self):
+    def test_reasoning_fallback_added_to_conversation(self, make_agent):
         """When reasoning fallback is used, it's added to conversation history."""
         responses = [
             FakeLLMResponse(reasoning_content="Deep analysis here.")
             for _ in range(10)
         ]
         llm = FakeLLM(responses)
-        agent = _make_agent(llm)
+        agent = make_agent(llm)
 
         result = agent.chat("analyze this")
         # Check the fallback was stored in conversation
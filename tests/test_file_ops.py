@@ -1,13 +1,18 @@
 """Tests for file operations performance optimizations."""
 
+import gc
 import json
 import os
-import time
+import threading
+import weakref
+from collections import Counter
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 
+import isrc101_agent.tools.file_ops as file_ops_module
+import isrc101_agent.undo as undo_module
 from isrc101_agent.undo import UndoManager, MAX_UNDO_HISTORY, _FLUSH_INTERVAL
 from isrc101_agent.tools.file_ops import FileOps, FileOperationError
 from isrc101_agent.diff_utils import apply_unified_diff, DiffApplyError
@@ -30,12 +35,12 @@ class TestUndoBackupContentParam:
             # read_text should not be called by backup_file since we passed content
             mock_read.assert_not_called()
 
-        assert undo._history[-1].content == "original"
+        assert undo._read_blob(undo._history[-1].content_hash) == b"original"
 
     def test_content_none_for_new_file(self, tmp_dir):
         undo = UndoManager(str(tmp_dir))
         undo.backup_file("new.txt", "create_file", {}, content=None)
-        assert undo._history[-1].content is None
+        assert undo._history[-1].content_hash is None
 
     def test_sentinel_fallback_reads_disk(self, tmp_dir):
         undo = UndoManager(str(tmp_dir))
@@ -44,7 +49,7 @@ class TestUndoBackupContentParam:
 
         # Omit content param (uses ... sentinel) — should read from disk
         undo.backup_file("test.txt", "str_replace", {})
-        assert undo._history[-1].content == "disk content"
+        assert undo._read_blob(undo._history[-1].content_hash) == b"disk content"
 
 
 class TestUndoDeferredFlush:
@@ -70,7 +75,7 @@ class TestUndoDeferredFlush:
         # After _FLUSH_INTERVAL operations, should have flushed
         assert undo._dirty == 0
         assert undo.history_file.exists()
-        data = json.loads(undo.history_file.read_text())
+        data = [json.loads(line) for line in undo.history_file.read_text().splitlines()]
         assert len(data) == _FLUSH_INTERVAL
 
     def test_explicit_flush(self, tmp_dir):
@@ -103,6 +108,307 @@ class TestUndoDeferredFlush:
         assert undo._dirty == 0
 
 
+class TestUndoHistoryLog:
+    """History is persisted as an append-only JSON-lines log."""
+
+    def test_flushes_append_instead_of_rewrite(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        undo.flush()
+        first = undo.history_file.read_text()
+        undo.backup_file("b.txt", "edit", {}, content="b")
+        undo.flush()
+        second = undo.history_file.read_text()
+        assert second.startswith(first)
+        assert len(second.splitlines()) == 2
+
+    def test_history_reloads_from_log(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {"path": "a.txt"}, content="line1\nline2")
+        undo.flush()
+
+        reloaded = UndoManager(str(tmp_dir))
+        assert reloaded.undo_count == 1
+        assert reloaded._read_blob(reloaded._history[-1].content_hash) == b"line1\nline2"
+        assert reloaded._history[-1].tool_args == {"path": "a.txt"}
+
+    def test_torn_last_line_is_skipped(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        undo.flush()
+        with open(undo.history_file, "a", encoding="utf-8") as f:
+            f.write('{"path": "b.txt", "cont')
+
+        assert UndoManager(str(tmp_dir)).undo_count == 1
+
+    def test_log_is_compacted(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        for i in range(MAX_UNDO_HISTORY * 2 + _FLUSH_INTERVAL):
+            undo.backup_file(f"f{i}.txt", "edit", {}, content=str(i))
+        undo.flush()
+
+        lines = undo.history_file.read_text().splitlines()
+        assert len(lines) <= MAX_UNDO_HISTORY * 2
+        assert not undo.history_file.with_suffix(".jsonl.tmp").exists()
+        reloaded = UndoManager(str(tmp_dir))
+        assert reloaded.undo_count == MAX_UNDO_HISTORY
+        assert reloaded._read_blob(reloaded._history[-1].content_hash) == str(MAX_UNDO_HISTORY * 2 + _FLUSH_INTERVAL - 1).encode()
+
+    def test_undo_is_persisted(self, tmp_dir):
+        (tmp_dir / "a.txt").write_text("new", encoding="utf-8")
+        (tmp_dir / "b.txt").write_text("created", encoding="utf-8")
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="old")
+        undo.backup_file("b.txt", "create_file", {}, content=None)
+        undo.undo_last()
+
+        assert not (tmp_dir / "b.txt").exists()
+        reloaded = UndoManager(str(tmp_dir))
+        assert [b.path for b in reloaded._history] == ["a.txt"]
+
+    def test_noop_undo_defers_log_rewrite(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="old")
+        undo.backup_file("b.txt", "create_file", {}, content=None)
+        undo.flush()
+
+        with patch.object(undo, "_checkpoint", wraps=undo._checkpoint) as checkpoint:
+            assert "already doesn't exist" in undo.undo_last()
+            checkpoint.assert_not_called()
+            undo.backup_file("c.txt", "create_file", {}, content=None)
+            undo.flush()
+            checkpoint.assert_called_once()
+
+        reloaded = UndoManager(str(tmp_dir))
+        assert [b.path for b in reloaded._history] == ["a.txt", "c.txt"]
+
+    def test_restore_keeps_file_mode(self, tmp_dir):
+        target = tmp_dir / "run.sh"
+        target.write_text("new", encoding="utf-8")
+        target.chmod(0o755)
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("run.sh", "edit", {}, content="old")
+        undo.undo_last()
+        assert target.read_text(encoding="utf-8") == "old"
+        assert target.stat().st_mode & 0o777 == 0o755
+        assert [p.name for p in tmp_dir.iterdir() if p.name.endswith("undo-tmp")] == []
+
+    @pytest.mark.parametrize("has_orjson", [True, False])
+    def test_log_roundtrip_with_either_encoder(self, tmp_dir, monkeypatch, has_orjson):
+        if has_orjson and not undo_module.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(undo_module, "HAS_ORJSON", has_orjson)
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("文件.txt", "edit", {"old": "旧"}, content="x")
+        undo.flush()
+        raw = undo.history_file.read_text(encoding="utf-8")
+        assert raw.endswith("}\n") and '"old":"旧"' in raw
+
+        reloaded = UndoManager(str(tmp_dir))
+        assert reloaded._history[-1].path == "文件.txt"
+        assert reloaded._history[-1].tool_args == {"old": "旧"}
+
+    def test_gitignore_checked_once(self, tmp_dir):
+        gitignore = tmp_dir / ".gitignore"
+        gitignore.write_text("*.pyc\n", encoding="utf-8")
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        with patch("isrc101_agent.undo.open", create=True) as mock_open:
+            undo.backup_file("b.txt", "edit", {}, content="b")
+            undo.flush()
+            mock_open.assert_not_called()
+        assert gitignore.read_text(encoding="utf-8").count(".isrc101-undo/") == 1
+
+    def test_dir_recreated_after_clear(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        undo.clear_history()
+        undo.backup_file("b.txt", "edit", {}, content="b")
+        undo.flush()
+        assert undo.history_file.exists()
+
+    def test_exit_hook_does_not_pin_managers(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        assert undo in undo_module._live_managers
+        ref = weakref.ref(undo)
+        del undo
+        gc.collect()
+        assert ref() is None
+
+    def test_close_flushes_and_releases_log(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        undo.close()
+        assert undo._dirty == 0 and undo._log_fd is None
+        assert UndoManager(str(tmp_dir)).undo_count == 1
+        undo.backup_file("b.txt", "edit", {}, content="b")
+        undo.close()  # reopens the log on demand
+        assert UndoManager(str(tmp_dir)).undo_count == 2
+
+    def test_exit_hook_flushes_live_managers(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="a")
+        undo_module._flush_all_at_exit()
+        assert undo._dirty == 0 and undo._log_fd is None
+        assert UndoManager(str(tmp_dir)).undo_count == 1
+
+
+class TestUndoSharedStore:
+    """Everything working on one project (e.g. crew workers) shares one manager."""
+
+    def test_file_ops_on_one_root_share_a_manager(self, tmp_dir):
+        main = FileOps(str(tmp_dir))
+        worker = FileOps(str(tmp_dir / "."))
+        assert main.undo is worker.undo
+        (tmp_dir / "sub").mkdir()
+        assert FileOps(str(tmp_dir / "sub")).undo is not main.undo
+
+    def test_worker_edits_join_the_session_history(self, tmp_dir):
+        (tmp_dir / "a.txt").write_text("old-a", encoding="utf-8")
+        (tmp_dir / "b.txt").write_text("old-b", encoding="utf-8")
+        main = FileOps(str(tmp_dir))
+        main.write_file("a.txt", "new-a")
+        FileOps(str(tmp_dir)).write_file("b.txt", "new-b")
+
+        assert main.undo.undo_count == 2
+        assert "Restored b.txt" in main.undo.undo_last()
+        assert "Restored a.txt" in main.undo.undo_last()
+        assert (tmp_dir / "a.txt").read_text(encoding="utf-8") == "old-a"
+        assert (tmp_dir / "b.txt").read_text(encoding="utf-8") == "old-b"
+        assert UndoManager(str(tmp_dir)).undo_count == 0
+
+    def test_concurrent_backups_are_all_kept(self, tmp_dir):
+        undo = undo_module.get_undo_manager(str(tmp_dir))
+
+        def work(n):
+            for i in range(5):
+                undo.backup_file(f"w{n}-{i}.txt", "edit", {}, content=f"{n}-{i}")
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        undo.flush()
+
+        reloaded = UndoManager(str(tmp_dir))
+        assert reloaded.undo_count == 40
+        for backup in reloaded._history:
+            assert reloaded._read_blob(backup.content_hash)
+
+    def test_missing_blob_is_dropped_gracefully(self, tmp_dir):
+        (tmp_dir / "a.txt").write_text("new", encoding="utf-8")
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="v1")
+        undo.backup_file("a.txt", "edit", {}, content="v2")
+        undo._blob_path(undo._history[-1].content_hash).unlink()
+
+        assert "backup content is missing" in undo.undo_last()
+        assert undo.undo_count == 1
+        assert "Restored" in undo.undo_last()
+        assert (tmp_dir / "a.txt").read_text(encoding="utf-8") == "v1"
+        assert UndoManager(str(tmp_dir)).undo_count == 0
+
+    def test_blobs_of_trimmed_records_from_earlier_sessions_are_removed(self, tmp_dir):
+        earlier = UndoManager(str(tmp_dir))
+        earlier.backup_file("old.txt", "edit", {}, content="from an earlier session")
+        earlier.flush()
+        old_blob = earlier._blob_path(earlier._history[0].content_hash)
+        del earlier
+        gc.collect()
+
+        undo = UndoManager(str(tmp_dir))
+        for i in range(MAX_UNDO_HISTORY + 1):
+            undo.backup_file(f"f{i}.txt", "edit", {}, content=str(i))
+        undo.flush()
+        assert old_blob.exists()
+        undo.undo_last()  # checkpoint trims the earliest record
+        assert not old_blob.exists()
+
+
+class TestUndoContentBlobs:
+    """Backed-up contents are stored once per distinct SHA-256 digest."""
+
+    def test_identical_content_shares_one_blob(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        for _ in range(3):
+            undo.backup_file("a.txt", "edit", {}, content="same")
+        undo.backup_file("b.txt", "edit", {}, content="other")
+        blobs = [p for p in undo.blob_dir.rglob("*") if p.is_file()]
+        assert len(blobs) == 2
+        undo.flush()
+        assert '"same"' not in undo.history_file.read_text()
+
+    def test_undo_restores_from_blob(self, tmp_dir):
+        target = tmp_dir / "a.txt"
+        target.write_text("new", encoding="utf-8")
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "edit", {}, content="old")
+        undo.undo_last()
+        assert target.read_text(encoding="utf-8") == "old"
+        # The blob is no longer referenced once the undo is checkpointed
+        assert not any(p.is_file() for p in undo.blob_dir.rglob("*"))
+
+    def test_large_content_is_stored_compressed(self, tmp_dir):
+        target = tmp_dir / "big.py"
+        original = "def f():\n    return 1\n" * 2000
+        target.write_text("new", encoding="utf-8")
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("big.py", "write_file", {}, content=original)
+        (blob,) = [p for p in undo.blob_dir.rglob("*") if p.is_file()]
+        assert blob.suffix == ".z"
+        assert blob.stat().st_size < len(original) // 4
+        undo.undo_last()
+        assert target.read_text(encoding="utf-8") == original
+        assert not blob.exists()
+
+    def test_repeated_backup_of_same_state_is_skipped(self, tmp_dir):
+        undo = UndoManager(str(tmp_dir))
+        undo.backup_file("a.txt", "str_replace", {}, content="v0")
+        undo.backup_file("a.txt", "str_replace", {}, content="v0")
+        undo.backup_file("a.txt", "str_replace", {}, content="v1")
+        undo.backup_file("b.txt", "str_replace", {}, content="v1")
+        assert undo.undo_count == 3
+
+    def test_sentinel_backup_restores_exact_bytes(self, tmp_dir):
+        target = tmp_dir / "data.bin"
+        original = b"\xff\xfe\x00crlf\r\n"
+        target.write_bytes(original)
+        undo = UndoManager(str(tmp_dir))
+        assert undo.backup_file("data.bin", "write_file", {}) is True
+        target.write_bytes(b"changed")
+        undo.undo_last()
+        assert target.read_bytes() == original
+
+    def test_legacy_history_json_is_migrated(self, tmp_dir):
+        undo_dir = tmp_dir / ".isrc101-undo"
+        undo_dir.mkdir()
+        legacy = [
+            {"path": "a.txt", "content": "legacy", "timestamp": "t1",
+             "operation": "write_file", "tool_args": {"path": "a.txt"}},
+            {"path": "b.txt", "content": None, "timestamp": "t2",
+             "operation": "create_file", "tool_args": {"path": "b.txt"}},
+        ]
+        (undo_dir / "history.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+        (tmp_dir / "a.txt").write_text("edited", encoding="utf-8")
+        (tmp_dir / "b.txt").write_text("created", encoding="utf-8")
+
+        undo = UndoManager(str(tmp_dir))
+        assert undo.undo_count == 2
+        assert not (undo_dir / "history.json").exists()
+        assert UndoManager(str(tmp_dir)).undo_count == 2
+        assert "Deleted b.txt" in undo.undo_last()
+        assert "Restored a.txt" in undo.undo_last()
+        assert (tmp_dir / "a.txt").read_text(encoding="utf-8") == "legacy"
+
+    def test_unreadable_legacy_history_json_is_removed(self, tmp_dir):
+        undo_dir = tmp_dir / ".isrc101-undo"
+        undo_dir.mkdir()
+        (undo_dir / "history.json").write_text("{not json", encoding="utf-8")
+        assert UndoManager(str(tmp_dir)).undo_count == 0
+        assert not (undo_dir / "history.json").exists()
+
+
 # ── FileOps content cache tests ──────────────────────────────
 
 
@@ -139,10 +445,11 @@ class TestFileOpsContentCache:
         fp = ops._resolve("test.txt")
 
         ops._read_cached(fp)
+        st = target.stat()
 
-        # Modify file (change mtime)
-        time.sleep(0.01)
+        # Same-size rewrite; bump mtime explicitly instead of waiting for a clock tick
         target.write_text("v2", encoding="utf-8")
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
 
         result = ops._read_cached(fp)
         assert result == "v2"
@@ -159,132 +466,113 @@ class TestFileOpsContentCache:
         ops._invalidate_cache(fp)
         assert str(fp) not in ops._content_cache
 
+    def test_read_cached_detects_size_change_at_same_mtime(self, tmp_dir):
+        ops = FileOps(str(tmp_dir))
+        target = tmp_dir / "test.txt"
+        target.write_text("v1", encoding="utf-8")
+        fp = ops._resolve("test.txt")
+        st = target.stat()
+        ops._read_cached(fp)
+
+        target.write_text("longer", encoding="utf-8")
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert ops._read_cached(fp) == "longer"
+
+    def test_cache_evicts_least_recently_used(self, tmp_dir, monkeypatch):
+        monkeypatch.setattr(file_ops_module, "_CONTENT_CACHE_SIZE", 2)
+        ops = FileOps(str(tmp_dir))
+        paths = []
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (tmp_dir / name).write_text(name, encoding="utf-8")
+            paths.append(ops._resolve(name))
+
+        ops._read_cached(paths[0])
+        ops._read_cached(paths[1])
+        ops._read_cached(paths[0])  # a is now most recently used
+        ops._read_cached(paths[2])
+        assert list(ops._content_cache) == [str(paths[0]), str(paths[2])]
+
+
+@pytest.fixture
+def read_counter(monkeypatch):
+    """Count Path.read_text calls per path for the rest of the test."""
+    counts = Counter()
+    original_read = Path.read_text
+
+    def counting_read(self, *args, **kwargs):
+        counts[str(self)] += 1
+        return original_read(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read)
+    return counts
+
 
 class TestFileOpsNoRedundantReads:
     """File operations should not read the same file multiple times."""
 
-    def test_str_replace_reads_once(self, tmp_dir):
+    def test_str_replace_reads_once(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
         target.write_text("old text here", encoding="utf-8")
 
-        # Track actual disk reads via the real read_text
-        original_read = Path.read_text
-        read_count = [0]
-        target_str = str(target)
-
-        def counting_read(self, *args, **kwargs):
-            if str(self) == target_str:
-                read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            ops.str_replace("test.txt", "old text", "new text")
+        ops.str_replace("test.txt", "old text", "new text")
 
         # Should read exactly once (via _read_cached), not twice
-        assert read_count[0] == 1
+        assert read_counter[str(target)] == 1
         assert target.read_text() == "new text here"
 
-    def test_preview_then_apply_reads_once(self, tmp_dir):
+    def test_preview_then_apply_reads_once(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
         target.write_text("old text here", encoding="utf-8")
 
-        original_read = Path.read_text
-        read_count = [0]
-        target_str = str(target)
-
-        def counting_read(self, *args, **kwargs):
-            if str(self) == target_str:
-                read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            # Preview reads it once
-            ok, diff = ops.preview_str_replace("test.txt", "old text", "new text")
-            assert ok
-            # Apply should use cached content — no additional read
-            ops.str_replace("test.txt", "old text", "new text")
+        # Preview reads it once
+        ok, diff = ops.preview_str_replace("test.txt", "old text", "new text")
+        assert ok
+        # Apply should use cached content — no additional read
+        ops.str_replace("test.txt", "old text", "new text")
 
         # preview reads once (populates cache), str_replace uses cache = 1 total
-        assert read_count[0] == 1
+        assert read_counter[str(target)] == 1
 
-    def test_write_file_passes_content_to_backup(self, tmp_dir):
+    def test_write_file_passes_content_to_backup(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
         target.write_text("original", encoding="utf-8")
 
-        original_read = Path.read_text
-        read_count = [0]
-        target_str = str(target)
-
-        def counting_read(self, *args, **kwargs):
-            if str(self) == target_str:
-                read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            ops.write_file("test.txt", "new content")
+        ops.write_file("test.txt", "new content")
 
         # Should read exactly once (for backup content)
-        assert read_count[0] == 1
+        assert read_counter[str(target)] == 1
 
-    def test_append_file_reads_once(self, tmp_dir):
+    def test_append_file_reads_once(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
         target.write_text("line1\n", encoding="utf-8")
 
-        original_read = Path.read_text
-        read_count = [0]
-        target_str = str(target)
-
-        def counting_read(self, *args, **kwargs):
-            if str(self) == target_str:
-                read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            ops.append_file("test.txt", "line2\n")
+        ops.append_file("test.txt", "line2\n")
 
         # Should read once (_read_cached), reuse for both backup and append
-        assert read_count[0] == 1
+        assert read_counter[str(target)] == 1
         assert target.read_text() == "line1\nline2\n"
 
-    def test_create_file_no_reads(self, tmp_dir):
+    def test_create_file_no_reads(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
 
-        original_read = Path.read_text
-        read_count = [0]
-
-        def counting_read(self, *args, **kwargs):
-            read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            ops.create_file("new.txt", "content")
+        ops.create_file("new.txt", "content")
 
         # create_file passes content=None, no reads needed
-        assert read_count[0] == 0
+        assert sum(read_counter.values()) == 0
 
-    def test_delete_file_reads_once(self, tmp_dir):
+    def test_delete_file_reads_once(self, tmp_dir, read_counter):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
         target.write_text("to delete", encoding="utf-8")
 
-        original_read = Path.read_text
-        read_count = [0]
-        target_str = str(target)
-
-        def counting_read(self, *args, **kwargs):
-            if str(self) == target_str:
-                read_count[0] += 1
-            return original_read(self, *args, **kwargs)
-
-        with patch.object(Path, "read_text", counting_read):
-            ops.delete_file("test.txt")
+        ops.delete_file("test.txt")
 
         # Should read once for backup
-        assert read_count[0] == 1
+        assert read_counter[str(target)] == 1
         assert not target.exists()
 
 
@@ -393,6 +681,30 @@ class TestMultiEdit:
                 {"old_str": "aaa", "new_str": "bbb"},
             ])
 
+    def test_overlapping_edits_fail(self, tmp_dir):
+        ops = FileOps(str(tmp_dir))
+        target = tmp_dir / "test.txt"
+        target.write_text("foo bar baz\n")
+
+        with pytest.raises(FileOperationError, match="Edit 2: old_str overlaps edit 1"):
+            ops.multi_edit("test.txt", [
+                {"old_str": "foo bar", "new_str": "x"},
+                {"old_str": "bar baz", "new_str": "y"},
+            ])
+        assert target.read_text() == "foo bar baz\n"
+
+    def test_edits_apply_to_original_text(self, tmp_dir):
+        ops = FileOps(str(tmp_dir))
+        target = tmp_dir / "test.txt"
+        target.write_text("alpha beta\n")
+
+        # Edit 2 targets the original "beta", not the one edit 1 introduces
+        ops.multi_edit("test.txt", [
+            {"old_str": "alpha", "new_str": "beta\n"},
+            {"old_str": "beta\n", "new_str": "gamma\n"},
+        ])
+        assert target.read_text() == "beta\n gamma\n"
+
     def test_empty_edits_fails(self, tmp_dir):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
@@ -551,7 +863,7 @@ class TestRegexReplace:
         target.write_text("aaa bbb aaa bbb aaa\n")
 
         result = ops.regex_replace("test.txt", "aaa", "XXX", count=2)
-        assert "2 replacement(s)" in result
+        assert "2 replacement(s) made (of 3 match(es))" in result
         assert target.read_text() == "XXX bbb XXX bbb aaa\n"
 
     def test_group_replacement(self, tmp_dir):
@@ -600,6 +912,27 @@ class TestRegexReplace:
         with pytest.raises(FileOperationError, match="Invalid regex"):
             ops.regex_replace("test.txt", r"[invalid", "replacement")
 
+    def test_invalid_replacement_raises_before_backup(self, tmp_dir):
+        ops = FileOps(str(tmp_dir))
+        target = tmp_dir / "test.txt"
+        target.write_text("abc\n")
+
+        with pytest.raises(FileOperationError, match="Invalid replacement"):
+            ops.regex_replace("test.txt", r"b", r"\9")
+        assert target.read_text() == "abc\n"
+        assert ops.undo._history == []
+
+    def test_compiled_pattern_is_reused(self, tmp_dir):
+        ops = FileOps(str(tmp_dir))
+        target = tmp_dir / "test.txt"
+        target.write_text("a1 b2\n")
+
+        file_ops_module._compile_pattern.cache_clear()
+        ops.regex_replace("test.txt", r"\d", "N", count=1)
+        ops.regex_replace("test.txt", r"\d", "N")
+        assert target.read_text() == "aN bN\n"
+        assert file_ops_module._compile_pattern.cache_info().hits == 1
+
     def test_invalid_flag_raises(self, tmp_dir):
         ops = FileOps(str(tmp_dir))
         target = tmp_dir / "test.txt"
@@ -804,3 +1137,42 @@ class TestApplyUnifiedDiff:
         )
         result = apply_unified_diff(content, diff)
         assert result == "line1\nLINE2"
+
+    def test_zero_context_insertions(self):
+        content = "a\nb\nc\n"
+        diff = (
+            "--- a/f\n+++ b/f\n"
+            "@@ -0,0 +1 @@\n"
+            "+top\n"
+            "@@ -2,0 +4 @@\n"
+            "+after-b\n"
+        )
+        result = apply_unified_diff(content, diff)
+        assert result == "top\na\nb\nafter-b\nc\n"
+
+    def test_hunks_out_of_order(self):
+        content = "a\nb\nc\nd\n"
+        diff = (
+            "--- a/f\n+++ b/f\n"
+            "@@ -4 +4 @@\n"
+            "-d\n"
+            "+D\n"
+            "@@ -1 +1 @@\n"
+            "-a\n"
+            "+A\n"
+        )
+        assert apply_unified_diff(content, diff) == "A\nb\nc\nD\n"
+
+    def test_overlapping_hunks_raise(self):
+        diff = (
+            "--- a/f\n+++ b/f\n"
+            "@@ -1,2 +1,2 @@\n"
+            " a\n"
+            "-b\n"
+            "+B\n"
+            "@@ -2 +2 @@\n"
+            "-b\n"
+            "+X\n"
+        )
+        with pytest.raises(DiffApplyError, match="overlaps"):
+            apply_unified_diff("a\nb\n", diff)
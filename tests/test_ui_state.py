@@ -0,0 +1,143 @@
+"""Tests for UI state persistence and command usage statistics."""
+
+import gc
+import json
+import weakref
+from datetime import datetime
+
+import pytest
+
+import isrc101_agent.ui_state as ui_state_module
+from isrc101_agent.ui_state import UIStateManager
+
+
+@pytest.fixture
+def state_file(tmp_path, monkeypatch):
+    """Redirect UI state persistence into a temp directory."""
+    path = tmp_path / "ui_state.json"
+    monkeypatch.setattr(ui_state_module, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(ui_state_module, "UI_STATE_FILE", path)
+    yield path
+    # Run exit flushes while persistence still points at tmp_path
+    ui_state_module._flush_all_at_exit()
+
+
+class TestUIStateSaving:
+    """Dirty-flag + debounced persistence."""
+
+    def test_first_change_saves_immediately(self, state_file):
+        mgr = UIStateManager()
+        mgr.set_global_setting("theme", "github_light")
+        assert json.loads(state_file.read_text())["global"]["theme"] == "github_light"
+        assert not state_file.with_suffix(".json.tmp").exists()
+
+    def test_rapid_changes_are_debounced(self, state_file):
+        mgr = UIStateManager()
+        mgr.record_command_usage("/help")
+        mgr.record_command_usage("/model")
+        on_disk = json.loads(state_file.read_text())
+        assert "/model" not in on_disk["command_stats"]
+
+        mgr.flush()
+        on_disk = json.loads(state_file.read_text())
+        assert on_disk["command_stats"]["/model"]["count"] == 1
+
+    def test_flush_without_changes_does_not_write(self, state_file):
+        mgr = UIStateManager()
+        mgr.flush()
+        assert not state_file.exists()
+
+    @pytest.mark.parametrize("has_orjson", [True, False])
+    def test_saved_json_is_compact_utf8(self, state_file, monkeypatch, has_orjson):
+        if has_orjson and not ui_state_module.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(ui_state_module, "HAS_ORJSON", has_orjson)
+        mgr = UIStateManager()
+        mgr.set_global_setting("theme", "主题")
+        raw = state_file.read_text(encoding="utf-8")
+        assert '"theme":"主题"' in raw
+        assert "\n " not in raw
+
+    def test_saves_merge_with_other_managers(self, state_file):
+        first = UIStateManager()
+        second = UIStateManager()  # loaded before first's changes
+        first.set_global_setting("theme", "github_light")
+        first.record_command_usage("/help")
+        first.flush()
+
+        second.set_preference("truncation_mode", "full")
+        second.record_command_usage("/help")
+        second.flush()
+        on_disk = json.loads(state_file.read_text())
+        assert on_disk["global"]["theme"] == "github_light"
+        assert on_disk["preferences"]["truncation_mode"] == "full"
+        assert on_disk["command_stats"]["/help"]["count"] == 2
+        assert second.get_global_setting("theme") == "github_light"
+
+    def test_exit_hook_does_not_pin_managers(self, state_file):
+        mgr = UIStateManager()
+        assert mgr in ui_state_module._live_managers
+        ref = weakref.ref(mgr)
+        del mgr
+        gc.collect()
+        assert ref() is None
+
+    def test_state_reloads(self, state_file):
+        mgr = UIStateManager()
+        mgr.set_preference("truncation_mode", "full")
+        mgr.flush()
+        assert UIStateManager().get_preference("truncation_mode") == "full"
+
+
+class TestCommandPriority:
+    """Autocomplete priority scoring from usage stats."""
+
+    def test_unused_command_scores_zero(self, state_file):
+        mgr = UIStateManager()
+        assert mgr.get_command_priority_score("/help") == 0.0
+        assert mgr.get_all_priority_scores() == {}
+
+    def test_recent_usage_gets_recency_bonus(self, state_file):
+        mgr = UIStateManager()
+        mgr.record_command_usage("/model")
+        score = mgr.get_command_priority_score("/model")
+        assert 109.0 < score <= 110.0
+
+    def test_batch_scores_match_single(self, state_file):
+        mgr = UIStateManager()
+        for cmd in ("/help", "/model", "/model"):
+            mgr.record_command_usage(cmd)
+        scores = mgr.get_all_priority_scores()
+        assert set(scores) == {"/help", "/model"}
+        assert scores["/model"] > scores["/help"]
+        assert scores["/help"] == pytest.approx(mgr.get_command_priority_score("/help"))
+
+    def test_last_used_iso_written_on_save(self, state_file):
+        mgr = UIStateManager()
+        mgr.record_command_usage("/help")
+        entry = json.loads(state_file.read_text())["command_stats"]["/help"]
+        assert isinstance(entry["last_used_ts"], float)
+        assert entry["last_used"].startswith(str(datetime.now().year))
+        assert len(entry["last_used"]) == len("2024-01-01T00:00:00")
+
+    def test_legacy_iso_only_stats_are_migrated(self, state_file):
+        recent = datetime.now().isoformat()
+        state_file.write_text(json.dumps({
+            "command_stats": {
+                "/help": {"count": 1, "last_used": recent},
+                "/bad": {"count": 2, "last_used": "not-a-date"},
+            },
+        }))
+        mgr = UIStateManager()
+        assert mgr.get_command_priority_score("/help") > 100.0
+        assert mgr.get_command_priority_score("/bad") == 20.0
+        assert mgr.get_recent_commands() == ["/help"]
+
+    def test_top_and_recent_commands(self, state_file, monkeypatch):
+        clock = iter(range(1000, 2000))
+        monkeypatch.setattr(ui_state_module.time, "time", lambda: float(next(clock)))
+        mgr = UIStateManager()
+        for cmd in ("/help", "/model", "/model", "/diff", "/model", "/diff"):
+            mgr.record_command_usage(cmd)
+        assert mgr.get_top_commands(2) == [("/model", 3), ("/diff", 2)]
+        assert mgr.get_recent_commands(2) == ["/diff", "/model"]
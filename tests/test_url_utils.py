@@ -0,0 +1,49 @@
+"""Tests for URL/domain helpers."""
+
+import pytest
+
+from isrc101_agent.url_utils import url_host, matches_official_domains, extract_search_links
+
+_DOMAINS = ["docs.nvidia.com", "developer.nvidia.com"]
+
+
+class TestUrlHost:
+    def test_strips_www_and_lowercases(self):
+        assert url_host("https://WWW.Example.com/path") == "example.com"
+
+    def test_unparseable_returns_empty(self):
+        assert url_host("not a url") == ""
+
+
+class TestMatchesOfficialDomains:
+    @pytest.mark.parametrize("url,expected", [
+        ("https://docs.nvidia.com/cuda", True),
+        ("https://www.docs.nvidia.com/cuda", True),
+        ("https://sub.developer.nvidia.com/x", True),
+        ("https://nvidia.com/", False),
+        ("https://evildocs.nvidia.com.example.org/", False),
+        ("https://fakedocs.nvidia.com/", False),
+        ("", False),
+    ])
+    def test_matching(self, url, expected):
+        assert matches_official_domains(url, _DOMAINS) is expected
+
+    def test_empty_domain_list(self):
+        assert matches_official_domains("https://docs.nvidia.com/", []) is False
+
+
+class TestExtractSearchLinks:
+    def test_dedups_in_first_seen_order(self):
+        result = (
+            "1. [A](https://a.com/x)\n"
+            "2. [B](https://b.com/y)\n"
+            "3. [A again](https://a.com/x)\n"
+            "4. [C](http://c.org)"
+        )
+        assert extract_search_links(result) == [
+            "https://a.com/x", "https://b.com/y", "http://c.org",
+        ]
+
+    def test_empty_input(self):
+        assert extract_search_links(None) == []
+        assert extract_search_links("no links here") == []
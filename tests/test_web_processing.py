@@ -0,0 +1,55 @@
+"""Tests for web result summarization and preview formatting."""
+
+from isrc101_agent.web_processing import (
+    summarize_web_for_context,
+    format_web_result_preview,
+)
+
+_WEB_RESULT = "URL: https://example.com/docs\n\n  first line  \n\n" + "line content " * 60
+
+
+class TestSummarizeWebForContext:
+    def test_error_results_pass_through(self):
+        assert summarize_web_for_context("Error: boom", "brief", 4000, 5) == "Error: boom"
+
+    def test_full_mode_uses_truncate_fn(self):
+        out = summarize_web_for_context(_WEB_RESULT, "full", 4000, 5, truncate_fn=lambda s: s[:5])
+        assert out == "URL: "
+
+    def test_brief_keeps_header_and_first_line(self):
+        out = summarize_web_for_context(_WEB_RESULT, "brief", 4000, 5)
+        assert out.startswith("URL: https://example.com/docs\n\nfirst line")
+        assert "context summary omitted" in out
+
+    def test_summary_respects_char_budget(self):
+        out = summarize_web_for_context(_WEB_RESULT, "summary", 100, 5)
+        body = out.split("\n\n", 1)[1].split("\n\n...")[0]
+        assert len(body.replace("\n", "")) == 100
+
+    def test_missing_url_header(self):
+        out = summarize_web_for_context("just text", "summary", 4000, 5)
+        assert out == "URL: (not provided)\n\njust text"
+
+    def test_blank_result(self):
+        assert summarize_web_for_context("   ", "brief", 4000, 5) == "   "
+
+
+class TestFormatWebResultPreview:
+    def test_brief_preview(self):
+        out = format_web_result_preview(_WEB_RESULT, "brief", 5, 120)
+        assert out.startswith("web: https://example.com/docs | first line line content")
+        assert out.endswith("chars)")
+
+    def test_summary_preview_lines(self):
+        out = format_web_result_preview("URL: u\na\n\nb\nc", "summary", 2, 300)
+        assert out == "web: u\n     a\n     b\n     ... (3 chars omitted)"
+
+    def test_brief_preview_omitted_count(self):
+        out = format_web_result_preview("URL: u\n" + "x" * 100 + "\n" + "y" * 100, "brief", 5, 120)
+        assert out == f"web: u | {'x' * 100} {'y' * 19} ... (+81 chars)"
+
+    def test_empty_result(self):
+        assert format_web_result_preview("", "brief", 5, 120) == ""
+
+    def test_error_passthrough(self):
+        assert format_web_result_preview("⚠ blocked", "brief", 5, 120) == "⚠ blocked"